@@ -0,0 +1,130 @@
+"""Copyright 2024 Mysty<evieepy@gmail.com>
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Benchmark the streaming portal parser against the previous whole-body regex parser.
+
+Every ``*.html`` file in ``benchmarks/fixtures`` is treated as a recorded portal response body. Each fixture is also
+benchmarked with a large amount of trailing markup appended, which is where the streaming parser can exit early.
+
+Run from the project root with: ``python -m benchmarks.parser``
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import pathlib
+import re
+import sys
+import timeit
+import tracemalloc
+from typing import TYPE_CHECKING
+
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from importlib.machinery import ModuleSpec
+    from types import ModuleType
+
+    from core.parser import PortalParser
+
+
+ROOT: pathlib.Path = pathlib.Path(__file__).parent.parent
+FIXTURES: pathlib.Path = pathlib.Path(__file__).parent / "fixtures"
+LEGACY_RE: re.Pattern[str] = re.compile(r"\[(?P<pos>.*)\](.*?)(?P<updated>[0-9]{1,4})\s(?P<unit>h|m|s|d{1})?")
+
+CHUNK_SIZE: int = 1024
+PADDING: bytes = b'<div class="portal-footer"><a href="/report.php">Signaler une erreur</a></div>\n' * 2500
+
+type Result = tuple[list[int], int, str | None] | None
+
+
+def load_parser() -> type[PortalParser]:
+    # Loaded on its own, importing the core package reads config.toml and imports discord and wavelink...
+    spec: ModuleSpec | None = importlib.util.spec_from_file_location("_portal_parser", ROOT / "core" / "parser.py")
+    assert spec is not None and spec.loader is not None
+
+    module: ModuleType = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+
+    return module.PortalParser
+
+
+Parser: type[PortalParser] = load_parser()
+
+
+def legacy(body: bytes) -> Result:
+    match: re.Match[str] | None = LEGACY_RE.search("".join(body.decode().splitlines()))
+    if not match:
+        return None
+
+    try:
+        pos: list[int] = [int(p) for p in match.group("pos").split(",")]
+    except ValueError:
+        return None
+
+    return pos, int(match.group("updated")), match.group("unit")
+
+
+def streaming(body: bytes) -> Result:
+    parser: PortalParser = Parser()
+
+    for index in range(0, len(body), CHUNK_SIZE):
+        if parser.feed(body[index : index + CHUNK_SIZE]):
+            break
+    else:
+        parser.close()
+
+    if parser.pos is None or parser.updated is None:
+        return None
+
+    return parser.pos, parser.updated, parser.unit
+
+
+def peak_allocation(func: Callable[[bytes], Result], body: bytes) -> int:
+    tracemalloc.start()
+    func(body)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return peak
+
+
+def throughput(func: Callable[[bytes], Result], body: bytes) -> float:
+    number: int = max(1, 2_000_000 // len(body))
+    best: float = min(timeit.repeat(lambda: func(body), number=number, repeat=5))
+
+    return number / best
+
+
+def main() -> None:
+    bodies: list[tuple[str, bytes]] = []
+
+    for path in sorted(FIXTURES.glob("*.html")):
+        body: bytes = path.read_bytes()
+        bodies.append((path.stem, body))
+        bodies.append((f"{path.stem}+padding", body + PADDING))
+
+    print(f"{'fixture':<22} {'parser':<10} {'ops/s':>12} {'peak alloc':>12}  result")
+
+    for name, body in bodies:
+        for label, func in (("legacy", legacy), ("streaming", streaming)):
+            ops: float = throughput(func, body)
+            peak: int = peak_allocation(func, body)
+
+            print(f"{name:<22} {label:<10} {ops:>12,.0f} {peak:>11,}B  {func(body)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,8 +16,16 @@ limitations under the License.
 __version__: str = "0.0.1a"
 
 
+from .balancer import BalancedNode as BalancedNode, NodeBalancer as NodeBalancer
 from .bot import Bot as Bot
+from .cache import SearchCache as SearchCache, SearchResult as SearchResult
 from .config import CONFIG as CONFIG
+from .database import Database as Database
+from .decoder import decode_track as decode_track
+from .dispatch import Dispatcher as Dispatcher
 from .enums import *
-from .player import Player as Player
+from .parser import PortalParser as PortalParser
+from .player import Player as Player, QueuePages as QueuePages
+from .queue import History as History, Queue as Queue, QueueEntry as QueueEntry
+from .refresher import ViewRefresher as ViewRefresher
 from .utils import *
@@ -0,0 +1,139 @@
+"""Copyright 2024 Mysty<evieepy@gmail.com>
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from typing import TYPE_CHECKING, Any, Protocol, cast
+
+from aiohttp import web
+
+from .utils import SERVERS
+
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from types_.portals import SERVER_T, PortalPayload
+
+    from .bot import Bot
+
+
+__all__ = ("API",)
+
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+class PortalSource(Protocol):
+    epoch: int
+
+    def portal_snapshot(self, server: SERVER_T) -> tuple[int, dict[str, PortalPayload]] | None: ...
+
+
+class API:
+    """Small read-only HTTP API serving the cached portal state as JSON.
+
+    Every response carries an ``ETag`` derived from the payload version, so pollers sending ``If-None-Match`` receive
+    an empty ``304`` until the portal data actually changes.
+    """
+
+    def __init__(self, bot: Bot, *, host: str, port: int) -> None:
+        self.bot: Bot = bot
+        self.host: str = host
+        self.port: int = port
+
+        self.app: web.Application = web.Application()
+        self.app.add_routes([web.get("/portals", self.all_portals), web.get("/portals/{server}", self.server_portals)])
+
+        self._runner: web.AppRunner = web.AppRunner(self.app, access_log=None)
+        # Keyed by server, or None for every server, which can't clash with a configured server name...
+        self._cache: dict[str | None, tuple[str, bytes]] = {}
+
+    async def start(self) -> None:
+        await self._runner.setup()
+
+        site: web.TCPSite = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+
+        logger.info("Serving the portal API on http://%s:%s", self.host, self.port)
+
+    async def close(self) -> None:
+        await self._runner.cleanup()
+
+    @property
+    def source(self) -> PortalSource | None:
+        return cast("PortalSource | None", self.bot.get_cog("Portals"))
+
+    def _respond(self, request: web.Request, *, key: str | None, etag: str, build: Callable[[], Any]) -> web.Response:
+        headers: dict[str, str] = {"ETag": etag, "Cache-Control": "no-cache"}
+
+        matches: list[str] = [tag.strip() for tag in request.headers.get("If-None-Match", "").split(",")]
+        if etag in matches or "*" in matches:
+            return web.Response(status=304, headers=headers)
+
+        cached: tuple[str, bytes] | None = self._cache.get(key)
+        if not cached or cached[0] != etag:
+            cached = (etag, json.dumps(build(), separators=(",", ":")).encode())
+            self._cache[key] = cached
+
+        return web.Response(body=cached[1], headers=headers, content_type="application/json")
+
+    async def server_portals(self, request: web.Request) -> web.Response:
+        source: PortalSource | None = self.source
+        if not source:
+            raise web.HTTPServiceUnavailable(reason="Portal tracking is not currently loaded.")
+
+        server: SERVER_T = request.match_info["server"]
+        snapshot: tuple[int, dict[str, PortalPayload]] | None = source.portal_snapshot(server)
+
+        if snapshot is None:
+            # The server comes from the path, which may hold characters that aren't valid in a reason phrase...
+            body: str = json.dumps({"error": f"{server} is not a tracked server."})
+            raise web.HTTPNotFound(text=body, content_type="application/json")
+
+        version, portals = snapshot
+        etag: str = f'"{source.epoch}-{version}"'
+
+        return self._respond(
+            request,
+            key=server,
+            etag=etag,
+            build=lambda: {"server": server, "version": version, "portals": portals},
+        )
+
+    async def all_portals(self, request: web.Request) -> web.Response:
+        source: PortalSource | None = self.source
+        if not source:
+            raise web.HTTPServiceUnavailable(reason="Portal tracking is not currently loaded.")
+
+        snapshots: dict[SERVER_T, tuple[int, dict[str, PortalPayload]]] = {}
+        for server in SERVERS:
+            snapshot: tuple[int, dict[str, PortalPayload]] | None = source.portal_snapshot(server)
+
+            if snapshot is not None:
+                snapshots[server] = snapshot
+
+        versions: str = ",".join(f"{server}:{version}" for server, (version, _) in snapshots.items())
+        etag: str = f'"{source.epoch}-{hashlib.blake2b(versions.encode(), digest_size=8).hexdigest()}"'
+
+        return self._respond(
+            request,
+            key=None,
+            etag=etag,
+            build=lambda: {s: {"version": v, "portals": p} for s, (v, p) in snapshots.items()},
+        )
@@ -0,0 +1,154 @@
+"""Copyright 2024 Mysty<evieepy@gmail.com>
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import time
+from typing import TYPE_CHECKING, Any
+
+import aiohttp
+import wavelink
+from wavelink.websocket import Websocket
+
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    import discord
+
+
+__all__ = ("BalancedNode", "NodeBalancer")
+
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+# Lavalink sends 3000 frames per player per minute, frame stats are reported as totals over the last minute...
+FRAMES_PER_MINUTE: int = 3000
+# A node losing more than this fraction of its frames is considered degraded and its players are moved...
+DEGRADED_FRAME_LOSS: float = 0.1
+# A node which had its players moved off is not given players again for this many seconds. Once drained its frame
+# stats look healthy again, so without this players would flap between nodes...
+DRAIN_COOLDOWN: float = 300.0
+
+
+class _StatsWebsocket(Websocket):
+    def dispatch(self, event: str, /, *args: Any, **kwargs: Any) -> None:
+        super().dispatch(event, *args, **kwargs)
+
+        # The stats event doesn't say which node sent it, dispatch it again along with the node...
+        if event == "stats_update":
+            super().dispatch("node_stats", self.node, *args)
+
+
+class BalancedNode(wavelink.Node):
+    """A :class:`wavelink.Node` which also dispatches ``on_wavelink_node_stats(node, payload)``.
+
+    Only the stats Lavalink sends over the websocket carry frame stats, the REST stats endpoint always reports them
+    as null. This mirrors :meth:`wavelink.Node._connect`, with a websocket that attributes its stats to this node.
+    """
+
+    async def _connect(self, *, client: discord.Client | None) -> None:
+        client_: discord.Client | None = self._client or client
+
+        if not client_:
+            raise wavelink.InvalidClientException(
+                f"Unable to connect {self!r} as you have not provided a valid discord.Client."
+            )
+
+        self._client = client_
+
+        self._has_closed = False
+        if not self._session or self._session.closed:
+            self._session = aiohttp.ClientSession()
+
+        websocket: Websocket = _StatsWebsocket(node=self)
+        self._websocket = websocket
+        await websocket.connect()
+
+
+class NodeBalancer:
+    """Load-aware node selection from the stats each node sends over its websocket.
+
+    Penalties follow the weighting Lavalink clients commonly use: one point per playing player, growing
+    exponentially with CPU load and with the share of audio frames a node failed to send or sent empty.
+    """
+
+    def __init__(self) -> None:
+        self._stats: dict[str, wavelink.StatsEventPayload] = {}
+        self._drained: dict[str, float] = {}
+
+    @staticmethod
+    def _frame_loss(stats: wavelink.StatsEventPayload) -> float:
+        if not stats.frames or not stats.playing:
+            return 0.0
+
+        return (stats.frames.deficit + stats.frames.nulled) / (FRAMES_PER_MINUTE * stats.playing)
+
+    def penalty(self, node: wavelink.Node) -> float:
+        if node.status is not wavelink.NodeStatus.CONNECTED:
+            return math.inf
+
+        stats: wavelink.StatsEventPayload | None = self._stats.get(node.identifier)
+        if not stats:
+            return float(len(node.players))
+
+        cpu: float = 1.05 ** (100 * stats.cpu.system_load) * 10 - 10
+        deficit: float = 0.0
+        nulled: float = 0.0
+
+        if stats.frames and stats.playing:
+            deficit = 1.03 ** (500 * (stats.frames.deficit / FRAMES_PER_MINUTE)) * 600 - 600
+            nulled = (1.03 ** (500 * (stats.frames.nulled / FRAMES_PER_MINUTE)) * 300 - 300) * 2
+
+        # Players placed since the last stats update aren't in the stats yet...
+        players: int = max(stats.playing, len(node.players))
+        return players + cpu + deficit + nulled
+
+    def degraded(self, node: wavelink.Node) -> bool:
+        if node.status is not wavelink.NodeStatus.CONNECTED:
+            return True
+
+        stats: wavelink.StatsEventPayload | None = self._stats.get(node.identifier)
+        return stats is not None and self._frame_loss(stats) > DEGRADED_FRAME_LOSS
+
+    def cooling(self, node: wavelink.Node) -> bool:
+        drained: float | None = self._drained.get(node.identifier)
+        return drained is not None and time.monotonic() - drained < DRAIN_COOLDOWN
+
+    def drain(self, node: wavelink.Node) -> None:
+        self._drained[node.identifier] = time.monotonic()
+
+    def best(self, *, exclude: Iterable[wavelink.Node] = ()) -> wavelink.Node | None:
+        excluded: set[str] = {node.identifier for node in exclude}
+        nodes: list[wavelink.Node] = [
+            node
+            for node in wavelink.Pool.nodes.values()
+            if node.identifier not in excluded and not self.degraded(node) and not self.cooling(node)
+        ]
+
+        if not nodes:
+            return None
+
+        return min(nodes, key=self.penalty)
+
+    def update(self, node: wavelink.Node, stats: wavelink.StatsEventPayload) -> None:
+        self._stats[node.identifier] = stats
+
+    def discard(self, node: wavelink.Node) -> None:
+        self._stats.pop(node.identifier, None)
+        self._drained.pop(node.identifier, None)
@@ -15,13 +15,23 @@ limitations under the License.
 
 import logging
 import sys
+from typing import TYPE_CHECKING
 
 import aiohttp
 import discord
 from discord.ext import commands
 
 from . import __version__
+from .api import API
 from .config import CONFIG
+from .database import Database
+from .dispatch import Dispatcher
+from .player import PlayerButton
+from .refresher import ViewRefresher
+
+
+if TYPE_CHECKING:
+    from types_.config import Api
 
 
 logger: logging.Logger = logging.getLogger(__name__)
@@ -30,8 +40,15 @@ logger: logging.Logger = logging.getLogger(__name__)
 class Bot(commands.Bot):
     def __init__(self) -> None:
         ua: str = f"Doofis Bot/{__version__}, Python/{sys.version}, Discord.py/{discord.__version__}"
-        self.session: aiohttp.ClientSession = aiohttp.ClientSession(headers={"User-Agent": ua})
+        # Portal requests carry their own Cookie header per server, a shared jar would leak cookies between them...
+        self.session: aiohttp.ClientSession = aiohttp.ClientSession(
+            headers={"User-Agent": ua}, cookie_jar=aiohttp.DummyCookieJar()
+        )
         self.debug: bool = CONFIG["BOT"]["debug"]
+        self.database: Database = Database(CONFIG["BOT"].get("database", "doofis.db"))
+        self.api: API | None = None
+        self.dispatcher: Dispatcher = Dispatcher()
+        self.refresher: ViewRefresher = ViewRefresher(self.dispatcher)
 
         intents: discord.Intents = discord.Intents.default()
         intents.members = True
@@ -40,12 +57,30 @@ class Bot(commands.Bot):
         super().__init__(command_prefix=["d! ", "d!"], intents=intents, case_insensitive=True)
 
     async def setup_hook(self) -> None:
+        await self.database.setup()
+        self.dispatcher.start()
+        self.refresher.start()
+        self.add_dynamic_items(PlayerButton)
+
         await self.load_extension("jishaku")
         await self.load_extension("extensions")
 
+        config: Api | None = CONFIG.get("API")
+        if config and config.get("enabled", False):
+            self.api = API(self, host=config.get("host", "127.0.0.1"), port=config.get("port", 8080))
+            await self.api.start()
+
     async def on_ready(self) -> None:
         logger.info("Logged in as: %s", self.user)
 
     async def close(self) -> None:
+        if self.api:
+            await self.api.close()
+
+        # Unloads extensions first, which may still need the database, E.g. to save player snapshots...
+        await super().close()
+
+        await self.refresher.close()
+        await self.dispatcher.close()
         await self.session.close()
-        return await super().close()
+        await self.database.close()
@@ -0,0 +1,171 @@
+"""Copyright 2024 Mysty<evieepy@gmail.com>
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+import sys
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+import wavelink
+
+from .queue import QueueEntry
+
+
+if TYPE_CHECKING:
+    from types_.music import SearchCacheStats
+
+
+__all__ = ("SearchCache", "SearchResult")
+
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+URL_RE: re.Pattern[str] = re.compile(r"^[a-zA-Z][a-zA-Z0-9+.-]*://")
+
+
+class SearchResult:
+    """Compact search result, keeping only the encoded tracks and the playlist name and URL, if any.
+
+    Tracks are built as :class:`QueueEntry` for each caller, so setting state on them can't leak into the cache or
+    into another guild's queue, and the queue only decodes the ones that end up near its front.
+    """
+
+    __slots__ = ("encoded", "is_playlist", "name", "url")
+
+    def __init__(
+        self,
+        encoded: tuple[str, ...],
+        *,
+        is_playlist: bool = False,
+        name: str | None = None,
+        url: str | None = None,
+    ) -> None:
+        self.encoded: tuple[str, ...] = encoded
+        self.is_playlist: bool = is_playlist
+        self.name: str | None = name
+        self.url: str | None = url
+
+    @classmethod
+    def from_search(cls, result: wavelink.Search) -> SearchResult:
+        if isinstance(result, wavelink.Playlist):
+            encoded: tuple[str, ...] = tuple(sys.intern(t.encoded) for t in result.tracks)
+            return cls(encoded, is_playlist=True, name=result.name, url=result.url)
+
+        return cls(tuple(sys.intern(t.encoded) for t in result))
+
+    def __len__(self) -> int:
+        return len(self.encoded)
+
+    def __bool__(self) -> bool:
+        return bool(self.encoded)
+
+    def entries(self, *, requester_id: int = 0) -> list[QueueEntry]:
+        return [QueueEntry(encoded, requester_id=requester_id) for encoded in self.encoded]
+
+
+class SearchCache:
+    """LRU and TTL cache in front of :meth:`wavelink.Playable.search`.
+
+    Queries are normalized before lookup, and concurrent searches for the same query share a single request to
+    Lavalink. Results are kept as :class:`SearchResult` and the cache is bounded by the total number of tracks it
+    holds, so a few very large playlists can't pin thousands of :class:`wavelink.Playable` in memory.
+    """
+
+    def __init__(self, *, capacity: int = 20000, ttl: float = 900.0) -> None:
+        self.capacity: int = capacity
+        self.ttl: float = ttl
+
+        self._entries: OrderedDict[str, tuple[float, SearchResult]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Task[SearchResult]] = {}
+        self._tracks: int = 0
+
+        self.hits: int = 0
+        self.misses: int = 0
+        self.coalesced: int = 0
+        self.expired: int = 0
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        query = " ".join(query.split())
+
+        # URLs may be case sensitive, E.g. YouTube video IDs, plain searches aren't...
+        return query if URL_RE.match(query) else query.casefold()
+
+    def stats(self) -> SearchCacheStats:
+        return {
+            "size": len(self._entries),
+            "tracks": self._tracks,
+            "capacity": self.capacity,
+            "inflight": len(self._inflight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "expired": self.expired,
+        }
+
+    def _evict(self, key: str) -> None:
+        _, result = self._entries.pop(key)
+        self._tracks -= len(result)
+
+    async def search(self, query: str) -> SearchResult:
+        key: str = self.normalize(query)
+        entry: tuple[float, SearchResult] | None = self._entries.get(key)
+
+        if entry and entry[0] > time.monotonic():
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+            return entry[1]
+
+        if entry:
+            self._evict(key)
+            self.expired += 1
+
+        task: asyncio.Task[SearchResult] | None = self._inflight.get(key)
+        if task:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = asyncio.create_task(self._resolve(key, query))
+            self._inflight[key] = task
+
+        # Shielded so one caller giving up doesn't cancel the search for everyone else waiting on it...
+        return await asyncio.shield(task)
+
+    async def _resolve(self, key: str, query: str) -> SearchResult:
+        try:
+            result: SearchResult = SearchResult.from_search(await wavelink.Playable.search(query))
+        finally:
+            del self._inflight[key]
+
+        # Empty results are not cached, they are often a transient source error...
+        if result and len(result) <= self.capacity:
+            if key in self._entries:
+                self._evict(key)
+
+            self._entries[key] = (time.monotonic() + self.ttl, result)
+            self._tracks += len(result)
+
+            while self._tracks > self.capacity:
+                self._evict(next(iter(self._entries)))
+
+        logger.debug("Resolved search %r with %s result(s).", key, len(result))
+        return result
@@ -0,0 +1,234 @@
+"""Copyright 2024 Mysty<evieepy@gmail.com>
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import json
+import logging
+import sqlite3
+import time
+from typing import TYPE_CHECKING, Any
+
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from types_.music import PlayerSnapshot
+    from types_.portals import PortalPayload
+
+
+__all__ = ("Database",)
+
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+SCHEMA: str = """
+CREATE TABLE IF NOT EXISTS portal_observations (
+    server   TEXT    NOT NULL,
+    portal   TEXT    NOT NULL,
+    pos      TEXT    NOT NULL,
+    updated  INTEGER NOT NULL,
+    unit     TEXT    NOT NULL,
+    observed REAL    NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS portal_observations_idx ON portal_observations (server, portal, observed);
+
+CREATE TABLE IF NOT EXISTS portal_messages (
+    channel_id INTEGER NOT NULL,
+    server     TEXT    NOT NULL,
+    message_id INTEGER NOT NULL,
+    PRIMARY KEY (channel_id, server)
+);
+
+CREATE TABLE IF NOT EXISTS portal_boards (
+    channel_id INTEGER NOT NULL,
+    server     TEXT    NOT NULL,
+    guild_id   INTEGER NOT NULL,
+    PRIMARY KEY (channel_id, server)
+);
+
+CREATE TABLE IF NOT EXISTS portal_subscriptions (
+    target_id  INTEGER NOT NULL,
+    is_channel INTEGER NOT NULL,
+    server     TEXT    NOT NULL,
+    portal     TEXT    NOT NULL DEFAULT '',
+    PRIMARY KEY (target_id, server, portal)
+);
+
+CREATE TABLE IF NOT EXISTS migrations (
+    name    TEXT PRIMARY KEY,
+    applied REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS player_snapshots (
+    guild_id INTEGER PRIMARY KEY,
+    data     TEXT    NOT NULL,
+    position INTEGER NOT NULL,
+    updated  REAL    NOT NULL
+);
+"""
+
+
+class Database:
+    """Small wrapper around a local SQLite database.
+
+    All queries are run on a single dedicated thread so the connection is never shared between threads and the
+    event loop is never blocked on disk I/O.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+
+        self._conn: sqlite3.Connection | None = None
+        self._executor: concurrent.futures.ThreadPoolExecutor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix="database",
+        )
+
+    async def _run[T](self, func: Callable[..., T], *args: Any) -> T:
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def _connect(self) -> None:
+        conn: sqlite3.Connection = sqlite3.connect(self.path)
+        conn.row_factory = sqlite3.Row
+
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        conn.commit()
+
+        self._conn = conn
+
+    def _execute(self, query: str, *args: Any) -> None:
+        assert self._conn
+
+        self._conn.execute(query, args)
+        self._conn.commit()
+
+    def _fetchall(self, query: str, *args: Any) -> list[sqlite3.Row]:
+        assert self._conn
+        return self._conn.execute(query, args).fetchall()
+
+    async def setup(self) -> None:
+        await self._run(self._connect)
+        logger.info("Connected to the local database: %s", self.path)
+
+    async def execute(self, query: str, *args: Any) -> None:
+        await self._run(self._execute, query, *args)
+
+    async def fetchall(self, query: str, *args: Any) -> list[sqlite3.Row]:
+        return await self._run(self._fetchall, query, *args)
+
+    async def close(self) -> None:
+        if self._conn:
+            await self._run(self._conn.close)
+
+        self._executor.shutdown(wait=False)
+
+    async def has_migration(self, name: str) -> bool:
+        rows: list[sqlite3.Row] = await self.fetchall("SELECT 1 FROM migrations WHERE name = ?", name)
+        return bool(rows)
+
+    async def add_migration(self, name: str) -> None:
+        await self.execute("INSERT OR IGNORE INTO migrations (name, applied) VALUES (?, ?)", name, time.time())
+
+    async def add_portal_observation(self, server: str, *, portal: str, payload: PortalPayload) -> None:
+        query: str = """
+        INSERT INTO portal_observations (server, portal, pos, updated, unit, observed) VALUES (?, ?, ?, ?, ?, ?)
+        """
+
+        pos: str = ",".join(str(p) for p in payload.get("pos", []))
+        await self.execute(
+            query, server, portal, pos, payload.get("updated", 0), payload.get("unit", "unknown"), time.time()
+        )
+
+    async def fetch_latest_portals(self) -> list[sqlite3.Row]:
+        query: str = """
+        SELECT server, portal, pos, updated, unit, MAX(observed) AS observed
+        FROM portal_observations
+        GROUP BY server, portal
+        """
+
+        return await self.fetchall(query)
+
+    async def fetch_portal_messages(self) -> list[sqlite3.Row]:
+        return await self.fetchall("SELECT channel_id, server, message_id FROM portal_messages")
+
+    async def set_portal_message(self, channel_id: int, *, server: str, message_id: int) -> None:
+        query: str = """
+        INSERT INTO portal_messages (channel_id, server, message_id) VALUES (?, ?, ?)
+        ON CONFLICT (channel_id, server) DO UPDATE SET message_id = excluded.message_id
+        """
+
+        await self.execute(query, channel_id, server, message_id)
+
+    async def fetch_portal_boards(self) -> list[sqlite3.Row]:
+        return await self.fetchall("SELECT channel_id, server, guild_id FROM portal_boards")
+
+    async def add_portal_board(self, channel_id: int, *, server: str, guild_id: int) -> None:
+        query: str = "INSERT OR IGNORE INTO portal_boards (channel_id, server, guild_id) VALUES (?, ?, ?)"
+        await self.execute(query, channel_id, server, guild_id)
+
+    async def remove_portal_board(self, channel_id: int, *, server: str) -> None:
+        await self.execute("DELETE FROM portal_boards WHERE channel_id = ? AND server = ?", channel_id, server)
+        await self.execute("DELETE FROM portal_messages WHERE channel_id = ? AND server = ?", channel_id, server)
+
+    async def fetch_portal_subscriptions(self) -> list[sqlite3.Row]:
+        return await self.fetchall("SELECT target_id, is_channel, server, portal FROM portal_subscriptions")
+
+    async def add_portal_subscription(self, target_id: int, *, is_channel: bool, server: str, portal: str) -> None:
+        query: str = """
+        INSERT OR IGNORE INTO portal_subscriptions (target_id, is_channel, server, portal) VALUES (?, ?, ?, ?)
+        """
+
+        await self.execute(query, target_id, is_channel, server, portal)
+
+    async def remove_portal_subscription(self, target_id: int, *, server: str, portal: str) -> None:
+        query: str = "DELETE FROM portal_subscriptions WHERE target_id = ? AND server = ? AND portal = ?"
+        await self.execute(query, target_id, server, portal)
+
+    async def remove_portal_subscriptions(self, target_id: int) -> None:
+        await self.execute("DELETE FROM portal_subscriptions WHERE target_id = ?", target_id)
+
+    async def fetch_player_snapshots(self) -> list[tuple[int, PlayerSnapshot]]:
+        rows: list[sqlite3.Row] = await self.fetchall("SELECT guild_id, data, position FROM player_snapshots")
+        snapshots: list[tuple[int, PlayerSnapshot]] = []
+
+        for row in rows:
+            snapshot: PlayerSnapshot = json.loads(row["data"])
+            snapshot["position"] = row["position"]
+            snapshots.append((row["guild_id"], snapshot))
+
+        return snapshots
+
+    async def save_player_snapshot(self, guild_id: int, *, snapshot: PlayerSnapshot) -> None:
+        query: str = """
+        INSERT INTO player_snapshots (guild_id, data, position, updated) VALUES (?, ?, ?, ?)
+        ON CONFLICT (guild_id) DO UPDATE SET data = excluded.data, position = excluded.position, updated = excluded.updated
+        """
+
+        data: str = json.dumps(snapshot, separators=(",", ":"))
+        await self.execute(query, guild_id, data, snapshot["position"], time.time())
+
+    async def update_player_position(self, guild_id: int, *, position: int) -> None:
+        query: str = "UPDATE player_snapshots SET position = ?, updated = ? WHERE guild_id = ?"
+        await self.execute(query, position, time.time(), guild_id)
+
+    async def delete_player_snapshot(self, guild_id: int) -> None:
+        await self.execute("DELETE FROM player_snapshots WHERE guild_id = ?", guild_id)
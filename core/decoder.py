@@ -0,0 +1,123 @@
+"""Copyright 2024 Mysty<evieepy@gmail.com>
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from __future__ import annotations
+
+import base64
+import struct
+from typing import TYPE_CHECKING
+
+
+if TYPE_CHECKING:
+    from wavelink.types.tracks import TrackInfoPayload, TrackPayload
+
+
+__all__ = ("decode_track",)
+
+
+TRACK_INFO_VERSIONED: int = 1
+
+
+class _Reader:
+    __slots__ = ("_data", "_offset")
+
+    def __init__(self, data: bytes) -> None:
+        self._data: bytes = data
+        self._offset: int = 0
+
+    def _take(self, size: int) -> bytes:
+        chunk: bytes = self._data[self._offset : self._offset + size]
+        if len(chunk) != size:
+            raise ValueError("Encoded track ended unexpectedly.")
+
+        self._offset += size
+        return chunk
+
+    def byte(self) -> int:
+        return self._take(1)[0]
+
+    def boolean(self) -> bool:
+        return self.byte() != 0
+
+    def int(self) -> int:
+        return struct.unpack(">i", self._take(4))[0]
+
+    def long(self) -> int:
+        return struct.unpack(">q", self._take(8))[0]
+
+    def utf(self) -> str:
+        size: int = struct.unpack(">H", self._take(2))[0]
+        raw: str = self._take(size).decode("utf-8", "surrogatepass")
+
+        # Java's modified UTF-8 writes characters outside the BMP as a surrogate pair, re-join them...
+        return raw.encode("utf-16", "surrogatepass").decode("utf-16")
+
+    def nullable_utf(self) -> str | None:
+        return self.utf() if self.boolean() else None
+
+    def tail_long(self) -> int:
+        return struct.unpack(">q", self._data[-8:])[0]
+
+
+def decode_track(encoded: str) -> TrackPayload:
+    """Decode a Lavalink encoded track locally, without a request to the node.
+
+    Only the fields common to every source are read. Source specific fields and plugin info are not part of the
+    result, so the returned payload always has an empty ``pluginInfo``.
+
+    Raises
+    ------
+    ValueError
+        The encoded track is malformed or of an unknown version.
+    """
+    reader: _Reader = _Reader(base64.b64decode(encoded))
+
+    header: int = reader.int()
+    flags: int = (header & 0xC0000000) >> 30
+    version: int = reader.byte() if flags & TRACK_INFO_VERSIONED else 1
+
+    if version not in (1, 2, 3):
+        raise ValueError(f"Unsupported encoded track version: {version}")
+
+    title: str = reader.utf()
+    author: str = reader.utf()
+    length: int = reader.long()
+    identifier: str = reader.utf()
+    is_stream: bool = reader.boolean()
+
+    uri: str | None = reader.nullable_utf() if version >= 2 else None
+    artwork: str | None = reader.nullable_utf() if version >= 3 else None
+    isrc: str | None = reader.nullable_utf() if version >= 3 else None
+
+    info: TrackInfoPayload = {
+        "identifier": identifier,
+        "isSeekable": not is_stream,
+        "author": author,
+        "length": length,
+        "isStream": is_stream,
+        "position": reader.tail_long(),
+        "title": title,
+        "sourceName": reader.utf(),
+    }
+
+    # Missing optional fields are left out rather than set to None, Playable reads them with .get...
+    if uri is not None:
+        info["uri"] = uri
+    if artwork is not None:
+        info["artworkUrl"] = artwork
+    if isrc is not None:
+        info["isrc"] = isrc
+
+    return {"encoded": encoded, "info": info, "pluginInfo": {}, "userData": {}}
@@ -0,0 +1,149 @@
+"""Copyright 2024 Mysty<evieepy@gmail.com>
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Any
+
+import discord
+
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Coroutine
+
+
+__all__ = ("Dispatcher",)
+
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+type Job = Callable[[], Coroutine[Any, Any, None]]
+
+
+class Dispatcher:
+    """Bounded fan-out of outgoing Discord requests.
+
+    Jobs are run by a fixed number of workers and paced by a global token bucket of ``rate`` requests per second.
+    Jobs submitted with the same ``key`` (E.g. a channel ID, which is what Discord buckets message routes by) are run
+    one after another, so a single route never receives a burst from this dispatcher. A worker only takes a key once
+    no other job for it is running, so a backlog for one route never ties up the rest of the pool.
+
+    Jobs submitted with ``urgent=True``, E.g. refreshing a player after a button press, are run before any other
+    waiting job, so they aren't held up behind a large batch of notifications.
+    """
+
+    def __init__(self, *, concurrency: int = 8, rate: float = 20.0) -> None:
+        self.concurrency: int = concurrency
+        self.rate: float = rate
+
+        # Per key, the waiting urgent jobs and the waiting normal jobs...
+        self._jobs: dict[int, tuple[deque[Job], deque[Job]]] = {}
+        # Keys with waiting jobs, urgent first. May hold stale or repeated keys, which are skipped when taken...
+        self._ready: tuple[deque[int], deque[int]] = (deque(), deque())
+        self._running: set[int] = set()
+        self._wakeup: asyncio.Event = asyncio.Event()
+        self._workers: list[asyncio.Task[None]] = []
+
+        self._unfinished: int = 0
+        self._idle: asyncio.Event = asyncio.Event()
+        self._idle.set()
+
+        self._tokens: float = rate
+        self._refilled: float = time.monotonic()
+
+    def start(self) -> None:
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    async def close(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+
+        await asyncio.gather(*self._workers, return_exceptions=True)
+
+    def submit(self, key: int, job: Job, *, urgent: bool = False) -> None:
+        jobs: tuple[deque[Job], deque[Job]] = self._jobs.setdefault(key, (deque(), deque()))
+        jobs[0 if urgent else 1].append(job)
+
+        self._unfinished += 1
+        self._idle.clear()
+
+        if key not in self._running:
+            self._schedule(key)
+
+    async def join(self) -> None:
+        await self._idle.wait()
+
+    def _schedule(self, key: int) -> None:
+        urgent, _ = self._jobs[key]
+        self._ready[0 if urgent else 1].append(key)
+        self._wakeup.set()
+
+    def _take(self) -> int | None:
+        for ready in self._ready:
+            while ready:
+                key: int = ready.popleft()
+
+                if key not in self._running and key in self._jobs:
+                    self._running.add(key)
+                    return key
+
+        return None
+
+    async def _acquire(self) -> None:
+        while True:
+            now: float = time.monotonic()
+            self._tokens = min(self.rate, self._tokens + (now - self._refilled) * self.rate)
+            self._refilled = now
+
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    async def _worker(self) -> None:
+        while True:
+            key: int | None = self._take()
+            if key is None:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            urgent, normal = self._jobs[key]
+            job: Job = urgent.popleft() if urgent else normal.popleft()
+
+            try:
+                await self._acquire()
+                await job()
+            except discord.HTTPException as e:
+                logger.warning("Dispatched request for %s failed: %s", key, e)
+            except Exception as e:
+                logger.exception("Unhandled error in dispatched request for %s", key, exc_info=e)
+            finally:
+                self._running.discard(key)
+
+                if urgent or normal:
+                    self._schedule(key)
+                else:
+                    del self._jobs[key]
+
+                self._unfinished -= 1
+                if not self._unfinished:
+                    self._idle.set()
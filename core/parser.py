@@ -0,0 +1,104 @@
+"""Copyright 2024 Mysty<evieepy@gmail.com>
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from __future__ import annotations
+
+import codecs
+import re
+
+
+__all__ = ("PortalParser",)
+
+
+POS_RE: re.Pattern[str] = re.compile(r"\[(?P<pos>\s*-?[0-9]+\s*(?:,\s*-?[0-9]+\s*)*)\]")
+AGE_RE: re.Pattern[str] = re.compile(r"(?P<updated>[0-9]{1,4})\s(?P<unit>[dhms])?")
+
+# The longest possible partial age match, E.g. "1234 " which may still be followed by its unit...
+AGE_TAIL: int = 6
+# Guard against an unterminated "[" holding the whole response in the buffer...
+MAX_BRACKET: int = 64
+
+
+class PortalParser:
+    """Incremental parser for a vulbis portal response.
+
+    Feed the response body in chunks with :meth:`feed`, which returns ``True`` as soon as both the position and the
+    update age have been found. Only the unconsumed tail of the body is ever held in memory.
+
+    Attributes
+    ----------
+    pos: list[int] | None
+        The portal coordinates, if found.
+    updated: int | None
+        The reported update age, if found.
+    unit: str | None
+        The single character unit of the update age, ``d``, ``h``, ``m`` or ``s``. ``None`` when no unit was given.
+    """
+
+    __slots__ = ("_buffer", "_decoder", "done", "pos", "unit", "updated")
+
+    def __init__(self, encoding: str = "utf-8") -> None:
+        self._decoder: codecs.IncrementalDecoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        self._buffer: str = ""
+
+        self.pos: list[int] | None = None
+        self.updated: int | None = None
+        self.unit: str | None = None
+        self.done: bool = False
+
+    def feed(self, chunk: bytes, *, final: bool = False) -> bool:
+        if self.done:
+            return True
+
+        self._buffer += self._decoder.decode(chunk, final)
+
+        if self.pos is None and not self._find_pos():
+            return False
+
+        self.done = self._find_age(final=final)
+        return self.done
+
+    def close(self) -> bool:
+        return self.feed(b"", final=True)
+
+    def _find_pos(self) -> bool:
+        match: re.Match[str] | None = POS_RE.search(self._buffer)
+
+        if not match:
+            start: int = self._buffer.rfind("[")
+            self._buffer = self._buffer[start:] if start != -1 and len(self._buffer) - start < MAX_BRACKET else ""
+            return False
+
+        self.pos = [int(p) for p in match.group("pos").split(",")]
+        self._buffer = self._buffer[match.end() :]
+
+        return True
+
+    def _find_age(self, *, final: bool) -> bool:
+        match: re.Match[str] | None = AGE_RE.search(self._buffer)
+
+        # A match touching the end of the buffer may still grow, E.g. more digits or the unit, so wait for more data...
+        if match and (final or match.end() < len(self._buffer)):
+            self.updated = int(match.group("updated"))
+            self.unit = match.group("unit")
+            self._buffer = ""
+            return True
+
+        if match:
+            self._buffer = self._buffer[match.start() :]
+        elif not final:
+            self._buffer = self._buffer[-AGE_TAIL:]
+
+        return False
@@ -16,18 +16,39 @@ limitations under the License.
 from __future__ import annotations
 
 import asyncio
-from typing import TYPE_CHECKING, Any, Literal, Self
+import json
+import logging
+import math
+from typing import TYPE_CHECKING, Any, Literal, Self, cast
 
 import discord
 import wavelink
 
+from .config import CONFIG
 from .enums import PlayerEmoji
+from .queue import History, Queue, QueueEntry
 
 
 if TYPE_CHECKING:
+    import re
+    from collections.abc import Awaitable, Callable
+
+    from types_.music import PlayerSnapshot
+
     from .bot import Bot
 
 
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+# Button presses within this many seconds of each other are applied to Lavalink as a single update...
+CONTROL_WINDOW: float = 0.35
+# Repost the player message once this many messages have been sent after it in the home channel...
+REPOST_THRESHOLD: int = 5
+# The number of upcoming tracks shown on each page of the queue...
+QUEUE_PAGE_SIZE: int = 10
+
+
 class ConfirmView(discord.ui.View):
     def __init__(self, *, timeout: float | None = 30) -> None:
         self.confirm: bool = False
@@ -43,120 +64,308 @@ class ConfirmView(discord.ui.View):
         self.stop()
 
 
-class PlayerView(discord.ui.View):
-    def __init__(self, *, timeout: float | None = None, player: Player) -> None:
-        self.player: Player = player
-        self.stopping: bool = False
+class QueuePages(discord.ui.View):
+    def __init__(self, player: Player, *, timeout: float | None = 120) -> None:
         super().__init__(timeout=timeout)
+        self.player: Player = player
+        self.page: int = 0
 
-    @discord.ui.button(emoji=PlayerEmoji.VOL_DOWN.value)
-    async def vol_down(self, interaction: discord.Interaction[Bot], button: discord.ui.Button[Self]) -> None:
-        await interaction.response.defer()
+    def build_embed(self) -> discord.Embed:
+        pages: int = self.player.queue_pages()
 
-        if not self.player.can_command(interaction.user):  # type: ignore
-            return
+        # The queue may have shrunk since the last page was shown...
+        self.page = min(self.page, pages - 1)
 
-        vol: int = max(0, self.player.volume - 10)
+        embed: discord.Embed = discord.Embed(title="Upcoming", colour=0xB19CD9)
+        embed.description = self.player.render_queue_page(self.page) or "`No upcoming songs yet!`"
+        embed.set_footer(text=f"Page {self.page + 1}/{pages} • {self.player.upcoming} songs")
 
-        await self.player.set_volume(vol)
-        self.player.next_payload = None
+        self.first_button.disabled = self.previous_button.disabled = self.page == 0
+        self.next_button.disabled = self.last_button.disabled = self.page >= pages - 1
 
-    @discord.ui.button(emoji=PlayerEmoji.SHUFFLE.value)
-    async def shuffle(self, interaction: discord.Interaction[Bot], button: discord.ui.Button[Self]) -> None:
-        await interaction.response.defer()
+        return embed
 
-        if not self.player.can_command(interaction.user):  # type: ignore
+    async def show(self, interaction: discord.Interaction[Bot], page: int) -> None:
+        self.page = max(0, page)
+        await interaction.response.edit_message(embed=self.build_embed(), view=self)
+
+    @discord.ui.button(label="First", style=discord.ButtonStyle.gray)
+    async def first_button(self, interaction: discord.Interaction[Bot], button: discord.ui.Button[Self]) -> None:
+        await self.show(interaction, 0)
+
+    @discord.ui.button(emoji=PlayerEmoji.BACKWARD.value, style=discord.ButtonStyle.gray)
+    async def previous_button(self, interaction: discord.Interaction[Bot], button: discord.ui.Button[Self]) -> None:
+        await self.show(interaction, self.page - 1)
+
+    @discord.ui.button(emoji=PlayerEmoji.FORWARD.value, style=discord.ButtonStyle.gray)
+    async def next_button(self, interaction: discord.Interaction[Bot], button: discord.ui.Button[Self]) -> None:
+        await self.show(interaction, self.page + 1)
+
+    @discord.ui.button(label="Last", style=discord.ButtonStyle.gray)
+    async def last_button(self, interaction: discord.Interaction[Bot], button: discord.ui.Button[Self]) -> None:
+        await self.show(interaction, self.player.queue_pages() - 1)
+
+
+# Action, emoji and whether the button is disabled, in the order they are shown on the player message...
+CONTROLS: tuple[tuple[str, PlayerEmoji | None, bool], ...] = (
+    ("vol_down", PlayerEmoji.VOL_DOWN, False),
+    ("shuffle", PlayerEmoji.SHUFFLE, False),
+    ("play_pause", PlayerEmoji.PAUSE, False),
+    ("loop", PlayerEmoji.REPLAY, True),
+    ("vol_up", PlayerEmoji.VOL_UP, False),
+    ("blank_one", None, True),
+    ("back", PlayerEmoji.BACKWARD, True),
+    ("stop", PlayerEmoji.STOP, False),
+    ("skip", PlayerEmoji.FORWARD, False),
+    ("blank_two", None, True),
+)
+
+
+class PlayerButton(
+    discord.ui.DynamicItem[discord.ui.Button[discord.ui.View]],
+    template=r"player:(?P<guild>[0-9]+):(?P<action>[a-z_]+)",
+):
+    """Stateless player control.
+
+    The guild and action are carried in the custom ID, so controls keep working on any player message, including
+    those sent before a restart, without a View being kept in memory per player. Registered once on the bot.
+    """
+
+    def __init__(
+        self,
+        guild_id: int,
+        action: str,
+        *,
+        emoji: str | None = None,
+        disabled: bool = False,
+    ) -> None:
+        self.guild_id: int = guild_id
+        self.action: str = action
+
+        button: discord.ui.Button[discord.ui.View] = discord.ui.Button(
+            custom_id=f"player:{guild_id}:{action}",
+            emoji=emoji,
+            label=None if emoji else "\u200b",
+            disabled=disabled,
+        )
+        super().__init__(button)
+
+    @classmethod
+    async def from_custom_id(
+        cls,
+        interaction: discord.Interaction[discord.Client],
+        item: discord.ui.Item[Any],
+        match: re.Match[str],
+        /,
+    ) -> Self:
+        return cls(int(match["guild"]), match["action"])
+
+    async def callback(self, interaction: discord.Interaction[Bot]) -> None:  # type: ignore[override]
+        player: Player | None = None
+
+        if interaction.guild and interaction.guild.id == self.guild_id:
+            vc: discord.VoiceProtocol | None = interaction.guild.voice_client
+            player = vc if isinstance(vc, Player) else None
+
+        if not player:
+            await interaction.response.send_message("This player is no longer active.", ephemeral=True)
             return
 
-        self.player.queue.shuffle()
-        self.player.auto_queue.shuffle()
-        self.player.next_payload = None
+        await player.control(self.action, interaction)
 
-    @discord.ui.button(emoji=PlayerEmoji.PAUSE.value)
-    async def play_pause(self, interaction: discord.Interaction[Bot], button: discord.ui.Button[Self]) -> None:
-        await interaction.response.defer()
 
-        if not self.player.can_command(interaction.user):  # type: ignore
+class Player(wavelink.Player):
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        self.home: discord.TextChannel | discord.VoiceChannel = kwargs.pop("home")
+        self.message: discord.Message | None = None
+        # Messages still visible below the player message, removed again as they are deleted...
+        self.messages_since: set[int] = set()
+        self._fingerprint: int | None = None
+
+        # Human members in the voice channel, in the order they joined. Kept up to date by the Music cog...
+        self.listeners: dict[int, None] = {}
+        self.idle_since: float | None = None
+
+        self._volume_target: int | None = None
+        self._paused_target: bool | None = None
+        self._controls_task: asyncio.Task[None] | None = None
+        self.stopping: bool = False
+        self.dj: discord.Member | None = kwargs.pop("dj", None)
+
+        self._next_payload: wavelink.Playable | None | Literal[False] = False
+        # History.played when AutoPlay last looked at the history...
+        self._seeded_played: int = 0
+
+        # Rendered queue pages, valid for as long as neither queue has changed since they were rendered...
+        self._pages: dict[int, str] = {}
+        self._pages_version: tuple[int, int] = (-1, -1)
+
+        super().__init__(*args, **kwargs)
+        history_size: int = CONFIG["WAVELINK"].get("history_size", 100)
+        self.queue: Queue = Queue(history_size=history_size)  # type: ignore
+        self.auto_queue: Queue = Queue(history_size=history_size)  # type: ignore
+
+    @property
+    def next_payload(self) -> wavelink.Playable | None | Literal[False]:
+        return self._next_payload
+
+    @next_payload.setter
+    def next_payload(self, value: wavelink.Playable | None | Literal[False]) -> None:
+        self._next_payload = value
+
+        if value is not False:
+            cast("Bot", self.client).refresher.mark(self)
+
+    @property
+    def refresh_key(self) -> int:
+        assert self.guild is not None
+        return self.guild.id
+
+    @property
+    def refresh_route(self) -> int:
+        return self.home.id
+
+    async def refresh(self) -> None:
+        # Already sent by a direct call to send_view, or the player has since disconnected...
+        if self._next_payload is False:
             return
 
-        await self.player.pause(not self.player.paused)
+        await self.send_view(self._next_payload)
 
-        if self.player.paused:
-            self.play_pause.emoji = PlayerEmoji.PLAY.value
-        else:
-            self.play_pause.emoji = PlayerEmoji.PAUSE.value
+    @property
+    def pending_volume(self) -> int:
+        return self.volume if self._volume_target is None else self._volume_target
 
-        self.player.next_payload = None
+    @property
+    def pending_paused(self) -> bool:
+        return self.paused if self._paused_target is None else self._paused_target
 
-    @discord.ui.button(disabled=True, emoji=PlayerEmoji.REPLAY.value)
-    async def replay(self, interaction: discord.Interaction[Bot], button: discord.ui.Button[Self]) -> None:
-        await interaction.response.defer()
+    def adjust_volume(self, delta: int) -> int:
+        self._volume_target = max(0, min(100, self.pending_volume + delta))
+        self._schedule_controls()
+
+        return self._volume_target
+
+    def toggle_pause(self) -> bool:
+        self._paused_target = not self.pending_paused
+        self._schedule_controls()
+
+        return self._paused_target
+
+    def _schedule_controls(self) -> None:
+        if not self._controls_task or self._controls_task.done():
+            self._controls_task = asyncio.create_task(self._apply_controls())
+
+    async def _apply_controls(self) -> None:
+        while self._volume_target is not None or self._paused_target is not None:
+            await asyncio.sleep(CONTROL_WINDOW)
+            volume, paused = self._volume_target, self._paused_target
+
+            try:
+                if volume is not None and volume != self.volume:
+                    await self.set_volume(volume)
 
-        if not self.player.can_command(interaction.user):  # type: ignore
+                if paused is not None and paused != self.paused:
+                    await self.pause(paused)
+            except Exception as e:
+                logger.warning("Unable to apply player controls in %s: %s", self.guild, e)
+
+            # Presses received while the update was in flight are kept for the next window...
+            if self._volume_target == volume:
+                self._volume_target = None
+
+            if self._paused_target == paused:
+                self._paused_target = None
+
+        self.next_payload = None
+
+    async def control(self, action: str, interaction: discord.Interaction[Bot]) -> None:
+        handler: Callable[[discord.Interaction[Bot]], Awaitable[None]] | None = getattr(
+            self, f"_control_{action}", None
+        )
+
+        if not handler:
+            await interaction.response.defer()
             return
 
-        if self.player.queue.mode is wavelink.QueueMode.normal:
-            self.player.queue.mode = wavelink.QueueMode.loop_all
+        await handler(interaction)
+
+    async def _control_vol_down(self, interaction: discord.Interaction[Bot]) -> None:
+        await interaction.response.defer()
 
-        elif self.player.queue.mode is wavelink.QueueMode.loop_all:
-            self.player.queue.mode = wavelink.QueueMode.loop
+        if self.can_command(interaction.user):  # type: ignore
+            self.adjust_volume(-10)
 
-        else:
-            self.player.queue.mode = wavelink.QueueMode.normal
+    async def _control_vol_up(self, interaction: discord.Interaction[Bot]) -> None:
+        await interaction.response.defer()
 
-        self.player.next_payload = None
+        if self.can_command(interaction.user):  # type: ignore
+            self.adjust_volume(10)
 
-    @discord.ui.button(emoji=PlayerEmoji.VOL_UP.value)
-    async def vol_up(self, interaction: discord.Interaction[Bot], button: discord.ui.Button[Self]) -> None:
+    async def _control_shuffle(self, interaction: discord.Interaction[Bot]) -> None:
         await interaction.response.defer()
 
-        if not self.player.can_command(interaction.user):  # type: ignore
+        if not self.can_command(interaction.user):  # type: ignore
             return
 
-        vol: int = min(100, self.player.volume + 10)
-
-        await self.player.set_volume(vol)
-        self.player.next_payload = None
+        self.queue.shuffle()
+        self.auto_queue.shuffle()
+        self.next_payload = None
 
-    @discord.ui.button(disabled=True, label="\u200b")
-    async def empty_one(self, interaction: discord.Interaction[Bot], button: discord.ui.Button[Self]) -> None:
+    async def _control_play_pause(self, interaction: discord.Interaction[Bot]) -> None:
         await interaction.response.defer()
 
-    @discord.ui.button(disabled=True, emoji=PlayerEmoji.BACKWARD.value)
-    async def empty_two(self, interaction: discord.Interaction[Bot], button: discord.ui.Button[Self]) -> None:
-        assert self.player.guild
+        if self.can_command(interaction.user):  # type: ignore
+            self.toggle_pause()
+
+    async def _control_loop(self, interaction: discord.Interaction[Bot]) -> None:
         await interaction.response.defer()
 
-        if not self.player.current:
+        if not self.can_command(interaction.user):  # type: ignore
             return
 
-        track: wavelink.Playable = self.player.current
-        extras: dict[str, Any] = dict(track.extras)
-        requester: discord.Member | None = self.player.guild.get_member(extras.get("requester_id", 0))
+        if self.queue.mode is wavelink.QueueMode.normal:
+            self.queue.mode = wavelink.QueueMode.loop_all
+
+        elif self.queue.mode is wavelink.QueueMode.loop_all:
+            self.queue.mode = wavelink.QueueMode.loop
 
-        if not self.player.can_command(interaction.user) and interaction.user != requester:  # type: ignore
+        else:
+            self.queue.mode = wavelink.QueueMode.normal
+
+        self.next_payload = None
+
+    def _is_requester(self, member: discord.abc.User) -> bool:
+        return bool(self.current) and dict(self.current.extras).get("requester_id", 0) == member.id  # type: ignore
+
+    async def _control_back(self, interaction: discord.Interaction[Bot]) -> None:
+        await interaction.response.defer()
+
+        if not self.current:
+            return
+
+        if not self.can_command(interaction.user) and not self._is_requester(interaction.user):  # type: ignore
             return
 
-        if self.player.position >= 7000:
-            await self.player.play(self.player.current, add_history=False)
+        if self.position >= 7000:
+            await self.play(self.current, add_history=False)
             return
 
-        assert self.player.queue.history
+        assert self.queue.history is not None
 
         try:
-            old: wavelink.Playable = self.player.queue.history.get_at(-1)
+            old: wavelink.Playable = self.queue.history.get_at(-1)
         except (IndexError, wavelink.QueueEmpty):
-            await self.player.play(self.player.current)
+            await self.play(self.current)
         else:
-            await self.player.play(old)
+            await self.play(old)
 
-    @discord.ui.button(emoji=PlayerEmoji.STOP.value)
-    async def stop_button(self, interaction: discord.Interaction[Bot], button: discord.ui.Button[Self]) -> None:
+    async def _control_stop(self, interaction: discord.Interaction[Bot]) -> None:
         await interaction.response.defer(ephemeral=True)
         if self.stopping:
             return
 
-        if not self.player.can_command(interaction.user):  # type: ignore
+        if not self.can_command(interaction.user):  # type: ignore
             return
 
         self.stopping = True
@@ -172,41 +381,117 @@ class PlayerView(discord.ui.View):
         if not confirm.confirm:
             return
 
-        await self.player.disconnect()
+        await self.disconnect()
 
-    @discord.ui.button(emoji=PlayerEmoji.FORWARD.value)
-    async def empty_three(self, interaction: discord.Interaction[Bot], button: discord.ui.Button[Self]) -> None:
-        assert self.player.guild
+    async def _control_skip(self, interaction: discord.Interaction[Bot]) -> None:
         await interaction.response.defer()
 
-        if not self.player.current:
+        if not self.current:
             return
 
-        track: wavelink.Playable = self.player.current
-        extras: dict[str, Any] = dict(track.extras)
-        requester: discord.Member | None = self.player.guild.get_member(extras.get("requester_id", 0))
+        if not self.can_command(interaction.user) and not self._is_requester(interaction.user):  # type: ignore
+            return
+
+        await self.skip(force=True)
+
+    def index_listeners(self, channel: discord.abc.Connectable | None = None) -> None:
+        channel = channel or self.channel
+        members: list[discord.Member] = getattr(channel, "members", [])
+
+        self.listeners = dict.fromkeys(m.id for m in members if not m.bot)
+
+    def snapshot_key(self) -> tuple[Any, ...]:
+        # Everything in a snapshot except the playback position, which is saved separately and far more often...
+        return (
+            self.queue.version,
+            self.current.encoded if self.current else None,
+            self.volume,
+            self.paused,
+            self.queue.mode,
+            self.autoplay,
+            self.dj.id if self.dj else None,
+            self.channel.id if self.channel else None,
+        )
+
+    def snapshot(self) -> PlayerSnapshot:
+        return {
+            "channel_id": self.channel.id,
+            "home_id": self.home.id,
+            "dj_id": self.dj.id if self.dj else None,
+            "volume": self.volume,
+            "paused": self.paused,
+            "mode": self.queue.mode.value,
+            "autoplay": self.autoplay.value,
+            "position": self.position,
+            "current": QueueEntry.from_playable(self.current).dump() if self.current else None,
+            "queue": [entry.dump() for entry in self.queue.entries()],
+        }
+
+    async def restore(self, snapshot: PlayerSnapshot) -> None:
+        self.queue.mode = wavelink.QueueMode(snapshot["mode"])
+        self.autoplay = wavelink.AutoPlayMode(snapshot["autoplay"])
+        self.queue.load(map(QueueEntry.load, snapshot["queue"]))
+
+        # Set directly, wavelink's play() treats a volume of 0 as "not given" and falls back to this...
+        self._volume = snapshot["volume"]
+
+        if not snapshot["current"]:
+            # Hibernated between tracks, pick up from the queue rather than rejoining silently...
+            if self.queue:
+                await self.play(self.queue.get(), paused=snapshot["paused"])
+            else:
+                await self.set_volume(snapshot["volume"])
 
-        if not self.player.can_command(interaction.user) and interaction.user != requester:  # type: ignore
             return
 
-        await self.player.skip(force=True)
+        track: wavelink.Playable = QueueEntry.load(snapshot["current"]).materialize()
+        await self.play(track, start=snapshot["position"], paused=snapshot["paused"], add_history=False)
 
-    @discord.ui.button(disabled=True, label="\u200b")
-    async def empty_four(self, interaction: discord.Interaction[Bot], button: discord.ui.Button[Self]) -> None:
-        await interaction.response.defer()
+    async def _do_recommendation(
+        self,
+        *,
+        populate_track: wavelink.Playable | None = None,
+        max_population: int | None = None,
+    ) -> None:
+        # wavelink seeds AutoPlay from how much the history grew, which stops once the ring is full. Re-base its
+        # count on the tracks played since it last looked instead...
+        history: History | None = self.queue.history
+        if history is not None and self._history_count is not None:
+            self._history_count = len(history) - min(history.played - self._seeded_played, len(history))
 
+        if history is not None:
+            self._seeded_played = history.played
 
-class Player(wavelink.Player):
-    def __init__(self, *args: Any, **kwargs: Any) -> None:
-        self.home: discord.TextChannel | discord.VoiceChannel = kwargs.pop("home")
-        self.message: discord.Message | None = None
-        self.view: PlayerView = PlayerView(player=self)
-        self.dj: discord.Member | None = kwargs.pop("dj", None)
+        await super()._do_recommendation(populate_track=populate_track, max_population=max_population)
 
-        self.updater_task: asyncio.Task[None] = asyncio.create_task(self.updater())
-        self.next_payload: wavelink.Playable | None | Literal[False] = False
+    async def replay(self, *, position: int | None = None) -> None:
+        """Re-send this player's voice state and current track to its node, E.g. after the node lost its session."""
+        position = self.position if position is None else position
+        await self._dispatch_voice_update()
 
-        super().__init__(*args, **kwargs)
+        if self.current:
+            await self.play(self.current, start=position, paused=self.paused, add_history=False)
+
+    async def switch_to_node(self, node: wavelink.Node) -> None:
+        """Move this player to another node, continuing the current track from its position."""
+        assert self.guild is not None
+
+        old: wavelink.Node = self.node
+        position: int = self.position
+
+        old._players.pop(self.guild.id, None)
+
+        if old.status is wavelink.NodeStatus.CONNECTED:
+            try:
+                await old._destroy_player(self.guild.id)
+            except Exception as e:
+                logger.debug("Unable to destroy player %s on %r while moving: %s", self.guild.id, old, e)
+
+        self._node = node
+        node._players[self.guild.id] = self
+
+        await self.replay(position=position)
+        logger.info("Moved player %s from %r to %r.", self.guild.id, old, node)
 
     def can_command(self, member: discord.Member) -> bool:
         if member == self.dj:
@@ -215,10 +500,10 @@ class Player(wavelink.Player):
         if self.home.permissions_for(member).manage_messages:
             return True
 
-        if member not in self.channel.members:
+        if member.id not in self.listeners:
             return False
 
-        if len(self.channel.members) <= 2:
+        if len(self.listeners) <= 1:
             return True
 
         return False
@@ -274,47 +559,110 @@ class Player(wavelink.Player):
 
         return embed
 
+    def build_view(self) -> discord.ui.View:
+        assert self.guild is not None
+        view: discord.ui.View = discord.ui.View(timeout=None)
+
+        for action, emoji, disabled in CONTROLS:
+            if action == "play_pause":
+                emoji = PlayerEmoji.PLAY if self.pending_paused else PlayerEmoji.PAUSE
+
+            view.add_item(PlayerButton(self.guild.id, action, emoji=emoji and emoji.value, disabled=disabled))
+
+        # Only used to render the components. Presses are routed to PlayerButton, so the view is never stored...
+        view.stop()
+        return view
+
+    @property
+    def upcoming(self) -> int:
+        return len(self.queue) + len(self.auto_queue)
+
+    def queue_pages(self) -> int:
+        return max(1, math.ceil(self.upcoming / QUEUE_PAGE_SIZE))
+
+    def render_queue_page(self, page: int) -> str:
+        version: tuple[int, int] = (self.queue.version, self.auto_queue.version)
+        if version != self._pages_version:
+            self._pages.clear()
+            self._pages_version = version
+
+        rendered: str | None = self._pages.get(page)
+        if rendered is not None:
+            return rendered
+
+        start: int = page * QUEUE_PAGE_SIZE
+        stop: int = start + QUEUE_PAGE_SIZE
+
+        # The auto queue is shown after the queue, as that's the order it is played in...
+        tracks: list[wavelink.Playable] = self.queue.peek_range(start, stop)
+        offset: int = len(self.queue)
+        tracks.extend(self.auto_queue.peek_range(max(0, start - offset), max(0, stop - offset)))
+
+        rows: list[str] = []
+        for index, track in enumerate(tracks, start + 1):
+            extras: dict[str, Any] = dict(track.extras)
+
+            if track.recommended or extras.get("recommended", False):
+                requester: str = f"`AutoPlay via {track.source}`"
+            else:
+                # A mention renders the member without having to look them up...
+                requester_id: int = extras.get("requester_id", 0)
+                requester = f"<@{requester_id}>" if requester_id else "Unknown"
+
+            rows.append(f"{index}. [{track}](<{track.uri}>) - {requester}")
+
+        rendered = "\n".join(rows)
+        self._pages[page] = rendered
+
+        return rendered
+
+    def fingerprint(self, embed: discord.Embed, view: discord.ui.View) -> int:
+        return hash((json.dumps(embed.to_dict(), sort_keys=True), json.dumps(view.to_components(), sort_keys=True)))
+
     async def send_view(self, track: wavelink.Playable | None | Literal[False] = None) -> None:
-        self.next_payload = False
+        self._next_payload = False
 
         assert self.guild is not None
         embed: discord.Embed = self.build_embed(track=track)
+        view: discord.ui.View = self.build_view()
+        fingerprint: int = self.fingerprint(embed, view)
 
-        if not self.message or not self.home.permissions_for(self.guild.me).read_message_history:
-            self.message = await self.home.send(view=self.view, embed=embed)
-            return
+        if self.message and len(self.messages_since) < REPOST_THRESHOLD:
+            if fingerprint == self._fingerprint:
+                return
 
-        async for msg in self.home.history(limit=5):
-            if msg.id == self.message.id:
-                await msg.edit(view=self.view, embed=embed)
+            try:
+                await self.message.edit(view=view, embed=embed)
+            except discord.NotFound:
+                self.message = None
+            else:
+                self._fingerprint = fingerprint
                 return
 
-        try:
-            await self.message.delete()
-        except discord.HTTPException:
-            pass
+        if self.message:
+            try:
+                await self.message.delete()
+            except discord.HTTPException:
+                pass
 
-        self.message = await self.home.send(view=self.view, embed=embed)
+        self.message = await self.home.send(view=view, embed=embed)
+        self.messages_since.clear()
+        self._fingerprint = fingerprint
 
     async def disconnect(self, **kwargs: Any) -> None:
-        if not self.message:
-            return
-
-        try:
-            self.updater_task.cancel()
-        except Exception:
-            pass
+        if self._controls_task:
+            self._controls_task.cancel()
 
-        try:
-            await self.message.delete()
-        except discord.HTTPException:
-            pass
+        self._next_payload = False
+        cast("Bot", self.client).refresher.discard(self)
 
-        return await super().disconnect(**kwargs)
+        # The message may already be gone, E.g. deleted by a moderator, which shouldn't keep the player connected...
+        if self.message:
+            try:
+                await self.message.delete()
+            except discord.HTTPException:
+                pass
 
-    async def updater(self) -> None:
-        while True:
-            if self.next_payload is not False:
-                await self.send_view(self.next_payload)
+            self.message = None
 
-            await asyncio.sleep(1)
+        return await super().disconnect(**kwargs)
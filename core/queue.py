@@ -0,0 +1,412 @@
+"""Copyright 2024 Mysty<evieepy@gmail.com>
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from __future__ import annotations
+
+import itertools
+import random
+import sys
+from collections import deque
+from collections.abc import Iterable, Iterator
+from typing import TYPE_CHECKING, Any, SupportsIndex, cast, overload
+
+import wavelink
+
+from .decoder import decode_track
+
+
+if TYPE_CHECKING:
+    from types_.music import SnapshotEntry
+
+
+__all__ = ("History", "Queue", "QueueEntry")
+
+
+# The number of tracks kept as Playable objects at the front of the queue...
+WINDOW: int = 25
+
+
+class QueueEntry:
+    """Compact, not yet materialized queue or history entry.
+
+    Only the encoded track is kept, interned so repeats of the same track share one string, along with the little
+    state this bot keeps in track extras. The track is decoded locally when it is materialized.
+    """
+
+    __slots__ = ("encoded", "recommended", "requester_id")
+
+    def __init__(self, encoded: str, *, requester_id: int = 0, recommended: bool = False) -> None:
+        self.encoded: str = sys.intern(encoded)
+        self.requester_id: int = requester_id
+        self.recommended: bool = recommended
+
+    @classmethod
+    def from_playable(cls, track: wavelink.Playable) -> QueueEntry:
+        extras: dict[str, Any] = dict(track.extras)
+        recommended: bool = track.recommended or extras.get("recommended", False)
+
+        return cls(track.encoded, requester_id=extras.get("requester_id", 0), recommended=recommended)
+
+    @classmethod
+    def load(cls, data: SnapshotEntry) -> QueueEntry:
+        encoded, requester_id, recommended = data
+        return cls(encoded, requester_id=requester_id, recommended=recommended)
+
+    def dump(self) -> SnapshotEntry:
+        return (self.encoded, self.requester_id, self.recommended)
+
+    def materialize(self) -> wavelink.Playable:
+        track: wavelink.Playable = wavelink.Playable(decode_track(self.encoded))
+        track._recommended = self.recommended
+
+        extras: dict[str, Any] = {}
+        if self.requester_id:
+            extras["requester_id"] = self.requester_id
+        if self.recommended:
+            extras["recommended"] = True
+
+        track.extras = extras
+        return track
+
+
+class Queue(wavelink.Queue):
+    """A :class:`wavelink.Queue` which only materializes the tracks near the front of the queue.
+
+    Only the first :data:`WINDOW` tracks are kept as :class:`wavelink.Playable`. Everything after them is kept as
+    :class:`QueueEntry` in a backlog and is materialized in windows as playback reaches it. Length, truthiness,
+    indexing, iteration and shuffle all cover the backlog, so the queue behaves like one list.
+    """
+
+    # The number of tracks kept as Playable objects at the front of this queue...
+    _window: int = WINDOW
+
+    def __init__(self, *, history: bool = True, history_size: int = 100) -> None:
+        super().__init__(history=False)
+        self._history: wavelink.Queue | None = History(size=history_size) if history else None
+        self._backlog: deque[QueueEntry] = deque()
+
+        # Bumped on every change to the queue contents, E.g. to tell whether it needs to be saved again...
+        self.version: int = 0
+
+    @property
+    def history(self) -> History | None:
+        return cast("History | None", self._history)
+
+    @property
+    def mode(self) -> wavelink.QueueMode:
+        return self._mode
+
+    @mode.setter
+    def mode(self, value: wavelink.QueueMode) -> None:
+        self._mode = value
+
+        # Looping the whole queue replays the history, so it can't be trimmed while that mode is on...
+        if self.history is not None:
+            self.history.bounded = value is not wavelink.QueueMode.loop_all
+
+    def _fill(self, count: int | None = None) -> None:
+        if count is None:
+            count = len(self._backlog) + len(self._items)
+        elif len(self._items) >= count:
+            return
+
+        target: int = max(count, self._window)
+        while self._backlog and len(self._items) < target:
+            self._items.append(self._backlog.popleft().materialize())
+
+    def _fill_index(self, index: SupportsIndex | slice) -> None:
+        if isinstance(index, slice):
+            indices: range = range(*index.indices(len(self)))
+            self._fill(max(indices) + 1 if indices else 0)
+            return
+
+        position: int = index.__index__()
+        self._fill(position + 1 if position >= 0 else None)
+
+    def __bool__(self) -> bool:
+        return bool(self._items) or bool(self._backlog)
+
+    def __len__(self) -> int:
+        return len(self._items) + len(self._backlog)
+
+    def __iter__(self) -> Iterator[wavelink.Playable]:
+        yield from self._items
+        yield from (entry.materialize() for entry in self._backlog)
+
+    def __reversed__(self) -> Iterator[wavelink.Playable]:
+        yield from (entry.materialize() for entry in reversed(self._backlog))
+        yield from reversed(self._items)
+
+    def __contains__(self, __other: wavelink.Playable) -> bool:
+        return __other in self._items or any(entry.encoded == __other.encoded for entry in self._backlog)
+
+    @overload
+    def __getitem__(self, __index: SupportsIndex, /) -> wavelink.Playable: ...
+
+    @overload
+    def __getitem__(self, __index: slice, /) -> list[wavelink.Playable]: ...
+
+    def __getitem__(self, __index: SupportsIndex | slice, /) -> wavelink.Playable | list[wavelink.Playable]:
+        # Reading from the end of the queue doesn't need everything before it materialized...
+        if not isinstance(__index, slice) and -len(self._backlog) <= __index.__index__() < 0:
+            return self._backlog[__index.__index__()].materialize()
+
+        self._fill_index(__index)
+        return super().__getitem__(__index)
+
+    def __setitem__(self, __index: SupportsIndex, __value: wavelink.Playable, /) -> None:
+        self._fill_index(__index)
+        self.version += 1
+        super().__setitem__(__index, __value)
+
+    def __delitem__(self, __index: int | slice, /) -> None:
+        self._fill_index(__index)
+        self.version += 1
+        super().__delitem__(__index)
+
+    def get(self) -> wavelink.Playable:
+        history: History | None = self.history
+        if self.mode is wavelink.QueueMode.loop_all and not self and history is not None:
+            self._backlog.extend(history._backlog)
+            history.clear()
+
+        self._fill(1)
+        self.version += 1
+        return super().get()
+
+    def get_at(self, index: int, /) -> wavelink.Playable:
+        self._fill_index(index)
+        self.version += 1
+        return super().get_at(index)
+
+    def put_at(self, index: int, value: wavelink.Playable, /) -> None:
+        self._fill_index(index)
+        self.version += 1
+        super().put_at(index, value)
+
+    def delete(self, index: int, /) -> None:
+        self._fill_index(index)
+        self.version += 1
+        super().delete(index)
+
+    def index(self, item: wavelink.Playable, /) -> int:
+        self._fill()
+        return super().index(item)
+
+    def put(
+        self,
+        item: list[wavelink.Playable] | wavelink.Playable | wavelink.Playlist,
+        /,
+        *,
+        atomic: bool = True,
+    ) -> int:
+        if not isinstance(item, Iterable):
+            self._check_compatibility(item)
+
+            self.version += 1
+
+            if self._backlog or len(self._items) >= self._window:
+                self._backlog.append(QueueEntry.from_playable(item))
+            else:
+                self._items.append(item)
+
+            self._wakeup_next()
+            return 1
+
+        if atomic:
+            self._check_atomic(item)
+            tracks: list[wavelink.Playable] = list(item)
+        else:
+
+            def try_compatibility(track: object) -> bool:
+                try:
+                    return self._check_compatibility(track)
+                except TypeError:
+                    return False
+
+            tracks = [track for track in item if try_compatibility(track)]
+
+        # Tracks which still fit in the window are kept as they are, rather than round-tripping through an entry...
+        kept: int = 0 if self._backlog else max(0, self._window - len(self._items))
+
+        self._items.extend(tracks[:kept])
+        self._backlog.extend(map(QueueEntry.from_playable, tracks[kept:]))
+        self.version += 1
+
+        self._wakeup_next()
+        return len(tracks)
+
+    async def put_wait(
+        self,
+        item: list[wavelink.Playable] | wavelink.Playable | wavelink.Playlist,
+        /,
+        *,
+        atomic: bool = True,
+    ) -> int:
+        async with self._lock:
+            return self.put(item, atomic=atomic)
+
+    def remove(self, item: wavelink.Playable, /, count: int | None = 1) -> int:
+        deleted: int = super().remove(item, count=count)
+        if count is not None and deleted >= count:
+            return deleted
+
+        kept: deque[QueueEntry] = deque()
+        for entry in self._backlog:
+            if entry.encoded == item.encoded and (count is None or deleted < count):
+                deleted += 1
+            else:
+                kept.append(entry)
+
+        self._backlog = kept
+        self.version += 1
+
+        return deleted
+
+    def shuffle(self) -> None:
+        entries: list[QueueEntry] = list(map(QueueEntry.from_playable, self._items))
+        entries.extend(self._backlog)
+        random.shuffle(entries)
+
+        self._items = []
+        self._backlog = deque(entries)
+        self._fill(WINDOW)
+        self.version += 1
+
+    def entries(self) -> list[QueueEntry]:
+        return [*map(QueueEntry.from_playable, self._items), *self._backlog]
+
+    def peek_range(self, start: int, stop: int) -> list[wavelink.Playable]:
+        # Unlike slicing, this leaves the backlog as it is. Only the tracks asked for are decoded, and not kept...
+        tracks: list[wavelink.Playable] = self._items[start:stop]
+        first: int = max(0, start - len(self._items))
+        last: int = max(0, stop - len(self._items))
+
+        tracks.extend(entry.materialize() for entry in itertools.islice(self._backlog, first, last))
+        return tracks
+
+    def load(self, entries: Iterable[QueueEntry]) -> None:
+        self._backlog.extend(entries)
+        self._fill(WINDOW)
+
+        self.version += 1
+        self._wakeup_next()
+
+    def clear(self) -> None:
+        super().clear()
+        self.version += 1
+        self._backlog.clear()
+
+    def reset(self) -> None:
+        super().reset()
+
+        if self.history is not None:
+            self.history.bounded = True
+
+    def copy(self) -> Queue:
+        queue: Queue = Queue(history=False)
+        queue._items = self._items.copy()
+        queue._backlog = self._backlog.copy()
+
+        return queue
+
+
+class History(Queue):
+    """Played tracks, kept only as :class:`QueueEntry` in a ring of at most ``size`` entries.
+
+    The oldest entries are dropped once the ring is full, unless :attr:`bounded` has been turned off, E.g. while the
+    owning queue loops over its history. Entries are decoded as they are read.
+    """
+
+    # Every entry is kept in the backlog, which is all the ring reads from...
+    _window: int = 0
+
+    def __init__(self, *, size: int = 100) -> None:
+        super().__init__(history=False)
+        self.size: int = size
+        self.bounded: bool = True
+
+        # Every track ever added, unlike the length this keeps growing once the ring is full...
+        self.played: int = 0
+
+    def _fill(self, count: int | None = None) -> None:
+        return
+
+    def _trim(self) -> None:
+        while self.bounded and len(self._backlog) > self.size:
+            self._backlog.popleft()
+
+    @overload
+    def __getitem__(self, __index: SupportsIndex, /) -> wavelink.Playable: ...
+
+    @overload
+    def __getitem__(self, __index: slice, /) -> list[wavelink.Playable]: ...
+
+    def __getitem__(self, __index: SupportsIndex | slice, /) -> wavelink.Playable | list[wavelink.Playable]:
+        if isinstance(__index, slice):
+            return [entry.materialize() for entry in list(self._backlog)[__index]]
+
+        return self._backlog[__index.__index__()].materialize()
+
+    def __setitem__(self, __index: SupportsIndex, __value: wavelink.Playable, /) -> None:
+        self._check_compatibility(__value)
+        self._backlog[__index.__index__()] = QueueEntry.from_playable(__value)
+
+    def __delitem__(self, __index: int | slice, /) -> None:
+        entries: list[QueueEntry] = list(self._backlog)
+        del entries[__index]
+
+        self._backlog = deque(entries)
+
+    def get(self) -> wavelink.Playable:
+        return self.get_at(0)
+
+    def get_at(self, index: int, /) -> wavelink.Playable:
+        if not self:
+            raise wavelink.QueueEmpty("There are no items currently in this queue.")
+
+        entry: QueueEntry = self._backlog[index]
+        del self._backlog[index]
+
+        return entry.materialize()
+
+    def delete(self, index: int, /) -> None:
+        del self._backlog[index]
+
+    def index(self, item: wavelink.Playable, /) -> int:
+        for index, entry in enumerate(self._backlog):
+            if entry.encoded == item.encoded:
+                return index
+
+        raise ValueError(f"{item!r} is not in the history.")
+
+    def put(
+        self,
+        item: list[wavelink.Playable] | wavelink.Playable | wavelink.Playlist,
+        /,
+        *,
+        atomic: bool = True,
+    ) -> int:
+        if isinstance(item, wavelink.Playable):
+            self._backlog.append(QueueEntry.from_playable(item))
+            self.played += 1
+            self._trim()
+            return 1
+
+        added: int = super().put(item, atomic=atomic)
+        self.played += added
+        self._trim()
+
+        return added
@@ -0,0 +1,91 @@
+"""Copyright 2024 Mysty<evieepy@gmail.com>
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Protocol
+
+
+if TYPE_CHECKING:
+    from .dispatch import Dispatcher
+
+
+__all__ = ("ViewRefresher",)
+
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+class Refreshable(Protocol):
+    @property
+    def refresh_key(self) -> int: ...
+
+    @property
+    def refresh_route(self) -> int: ...
+
+    async def refresh(self) -> None: ...
+
+
+class ViewRefresher:
+    """Single scheduler for refreshing every player message.
+
+    Players call :meth:`mark` when their message is out of date. Marks are debounced for ``delay`` seconds, so a burst
+    of changes to the same player results in one refresh, which is then handed to the :class:`~core.Dispatcher` as an
+    urgent job, ahead of any portal fan-out, and paced by its global request budget. The task only wakes when
+    something has been marked.
+    """
+
+    def __init__(self, dispatcher: Dispatcher, *, delay: float = 0.5) -> None:
+        self.dispatcher: Dispatcher = dispatcher
+        self.delay: float = delay
+
+        self._pending: dict[int, Refreshable] = {}
+        self._wakeup: asyncio.Event = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if not self._task:
+            return
+
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+
+    def mark(self, item: Refreshable) -> None:
+        self._pending[item.refresh_key] = item
+        self._wakeup.set()
+
+    def discard(self, item: Refreshable) -> None:
+        self._pending.pop(item.refresh_key, None)
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+
+            # Let any further changes from the same burst land before flushing...
+            await asyncio.sleep(self.delay)
+            self._wakeup.clear()
+
+            pending: dict[int, Refreshable] = self._pending
+            self._pending = {}
+
+            for item in pending.values():
+                self.dispatcher.submit(item.refresh_route, item.refresh, urgent=True)
+
+            logger.debug("Flushed %s pending view refreshes.", len(pending))
@@ -13,27 +13,138 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
-from types_.portals import SERVER_T
+import math
+import time
+from collections import deque
 
+from types_.portals import SERVER_T, ScheduleDecision
 
-__all__ = ("SERVERS", "ServerIter")
+from .config import CONFIG
 
 
-SERVERS: list[SERVER_T] = ["Tal Kasha", "Draconiros", "Hell Mina"]
+__all__ = ("SERVERS", "ScrapeScheduler")
 
 
-class ServerIter:
-    def __init__(self) -> None:
-        self.data: list[SERVER_T] = SERVERS
-        self.index: int = -1
-        self.max: int = len(self.data)
+SERVERS: list[SERVER_T] = CONFIG["SCRAPER"].get("servers", ["Tal Kasha", "Draconiros", "Hell Mina"])
 
-    def __len__(self) -> int:
-        return len(self.data)
 
-    def __next__(self) -> SERVER_T:
-        self.index += 1
-        if self.index + 1 > self.max:
-            self.index = 0
+class _Decayed:
+    """A counter which halves every ``half_life`` seconds."""
 
-        return self.data[self.index]
+    __slots__ = ("half_life", "stamp", "value")
+
+    def __init__(self, half_life: float) -> None:
+        self.half_life: float = half_life
+        self.value: float = 0.0
+        self.stamp: float = time.monotonic()
+
+    def get(self, now: float) -> float:
+        return self.value * math.pow(0.5, (now - self.stamp) / self.half_life)
+
+    def add(self, now: float, amount: float = 1.0) -> None:
+        self.value = self.get(now) + amount
+        self.stamp = now
+
+
+class ScrapeScheduler:
+    """Demand driven scheduler deciding which servers should be scraped next.
+
+    Each server is given a target refresh interval which shrinks from ``max_interval`` towards ``min_interval`` the
+    more often its portals move and the more often it is requested. A server is due once it has gone a full target
+    interval without a refresh, and due servers are refreshed in order of how overdue they are.
+
+    Refreshes are paid for from a token bucket which refills at ``budget`` server refreshes per hour, so the upstream
+    load never exceeds the configured budget regardless of demand.
+    """
+
+    def __init__(
+        self,
+        servers: list[SERVER_T],
+        *,
+        budget: float,
+        min_interval: float = 120,
+        max_interval: float = 1800,
+        half_life: float = 3600,
+    ) -> None:
+        self.servers: list[SERVER_T] = servers
+        self.budget: float = budget
+        self.min_interval: float = min_interval
+        self.max_interval: float = max_interval
+
+        self._tokens: float = float(len(servers))
+        self._capacity: float = float(len(servers))
+        self._refilled: float = time.monotonic()
+
+        self._last_fetch: dict[SERVER_T, float | None] = dict.fromkeys(servers, None)
+        self._changes: dict[SERVER_T, _Decayed] = {s: _Decayed(half_life) for s in servers}
+        self._requests: dict[SERVER_T, _Decayed] = {s: _Decayed(half_life) for s in servers}
+
+        self.decisions: deque[list[ScheduleDecision]] = deque(maxlen=20)
+
+    @property
+    def tokens(self) -> float:
+        return self._tokens
+
+    def record_change(self, server: SERVER_T) -> None:
+        self._changes[server].add(time.monotonic())
+
+    def record_request(self, server: SERVER_T) -> None:
+        self._requests[server].add(time.monotonic())
+
+    def interval(self, server: SERVER_T, *, now: float | None = None) -> float:
+        now = now or time.monotonic()
+
+        # Requests are far more frequent than portal changes, so weigh them down to keep them comparable...
+        weight: float = 1 + self._changes[server].get(now) + self._requests[server].get(now) / 5
+        return max(self.min_interval, self.max_interval / weight)
+
+    def score(self, server: SERVER_T, *, now: float | None = None) -> float:
+        now = now or time.monotonic()
+
+        last: float | None = self._last_fetch[server]
+        if last is None:
+            return math.inf
+
+        return (now - last) / self.interval(server, now=now)
+
+    def _refill(self, now: float) -> None:
+        elapsed: float = now - self._refilled
+        self._tokens = min(self._capacity, self._tokens + elapsed * self.budget / 3600)
+        self._refilled = now
+
+    def next_batch(self) -> list[SERVER_T]:
+        """Return the servers which should be scraped now, spending from the budget for each of them."""
+        now: float = time.monotonic()
+        self._refill(now)
+
+        ranked: list[tuple[float, SERVER_T]] = sorted(
+            ((self.score(s, now=now), s) for s in self.servers),
+            key=lambda r: r[0],
+            reverse=True,
+        )
+
+        batch: list[SERVER_T] = []
+        decisions: list[ScheduleDecision] = []
+
+        for score, server in ranked:
+            selected: bool = score >= 1 and self._tokens >= 1
+
+            if selected:
+                self._tokens -= 1
+                self._last_fetch[server] = now
+                batch.append(server)
+
+            decisions.append(
+                {
+                    "server": server,
+                    "score": score,
+                    "interval": self.interval(server, now=now),
+                    "changes": self._changes[server].get(now),
+                    "requests": self._requests[server].get(now),
+                    "selected": selected,
+                    "at": time.time(),
+                },
+            )
+
+        self.decisions.append(decisions)
+        return batch
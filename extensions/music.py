@@ -13,25 +13,284 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
-from typing import cast
+import asyncio
+import logging
+import time
+from typing import TYPE_CHECKING, Any, cast
 
 import discord
 import wavelink
-from discord.ext import commands
+from discord.ext import commands, tasks
 
 import core
+from types_.music import PlayerSnapshot
+
+
+if TYPE_CHECKING:
+    from types_.config import Wavelink, WavelinkNode
+    from types_.music import SearchCacheStats
+
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+# Seconds a player may stay paused or alone in its channel before it hibernates...
+HIBERNATE_AFTER: float = 180.0
+
+MAX_BULK_QUERIES: int = 50
+MAX_BULK_FILE_SIZE: int = 64 * 1024
+BULK_CONCURRENCY: int = 5
 
 
 class Music(commands.Cog):
     def __init__(self, bot: core.Bot) -> None:
         self.bot: core.Bot = bot
 
+        config: Wavelink = core.CONFIG["WAVELINK"]
+        self.search_cache: core.SearchCache = core.SearchCache(
+            capacity=config.get("search_cache_tracks", 20000),
+            ttl=config.get("search_cache_ttl", 900.0),
+        )
+
+        self.balancer: core.NodeBalancer = core.NodeBalancer()
+        self._snapshot_keys: dict[int, tuple[Any, ...] | None] = {}
+        self._hibernating: dict[int, PlayerSnapshot] = {}
+        self._restored: bool = False
+
     async def cog_load(self) -> None:
-        uri: str = core.CONFIG["WAVELINK"]["host"]
-        password: str = core.CONFIG["WAVELINK"]["password"]
+        config: Wavelink = core.CONFIG["WAVELINK"]
+        entries: list[WavelinkNode] = config.get("nodes") or [
+            {"host": config.get("host", ""), "password": config.get("password", "")}
+        ]
+
+        nodes: list[wavelink.Node] = [
+            core.BalancedNode(identifier=entry.get("identifier"), uri=entry["host"], password=entry["password"])
+            for entry in entries
+        ]
+        await wavelink.Pool.connect(nodes=nodes, cache_capacity=200, client=self.bot)
+
+        # Hibernated players are only woken on demand, so they are loaded even when there is nothing to restore...
+        for guild_id, snapshot in await self.bot.database.fetch_player_snapshots():
+            if snapshot.get("hibernating"):
+                self._hibernating[guild_id] = snapshot
+
+        self.balance_nodes.start()
+
+        # Reloaded while running, the players are still connected so there is nothing to restore...
+        if self.bot.is_ready():
+            self._restored = True
+            self.snapshot_players.start()
+            self.hibernate_idle.start()
+
+    async def cog_unload(self) -> None:
+        self.balance_nodes.cancel()
+        self.hibernate_idle.cancel()
+        self.snapshot_players.cancel()
+
+        # Save a final, complete snapshot before the players are disconnected on shutdown...
+        self._snapshot_keys = dict.fromkeys(self._snapshot_keys)
+        await self._snapshot_players()
+
+    async def _snapshot_players(self) -> None:
+        players: dict[int, core.Player] = {
+            vc.guild.id: vc for vc in self.bot.voice_clients if isinstance(vc, core.Player) and vc.guild
+        }
+
+        for guild_id in set(self._snapshot_keys) - set(players):
+            del self._snapshot_keys[guild_id]
+
+            # Hibernating players keep their row, it is what they are woken from...
+            if guild_id not in self._hibernating:
+                await self.bot.database.delete_player_snapshot(guild_id)
+
+        for guild_id, player in players.items():
+            if not player.connected or guild_id in self._hibernating:
+                continue
+
+            key: tuple[Any, ...] = player.snapshot_key()
+
+            if key != self._snapshot_keys.get(guild_id):
+                await self.bot.database.save_player_snapshot(guild_id, snapshot=player.snapshot())
+
+                # The player may have started hibernating while this was saved...
+                if guild_id not in self._hibernating:
+                    self._snapshot_keys[guild_id] = key
+            elif player.playing and not player.paused:
+                await self.bot.database.update_player_position(guild_id, position=player.position)
+
+    @tasks.loop(seconds=15)
+    async def snapshot_players(self) -> None:
+        await self._snapshot_players()
+
+    async def _restore_player(self, guild_id: int, snapshot: PlayerSnapshot) -> core.Player | None:
+        guild: discord.Guild | None = self.bot.get_guild(guild_id)
+        if not guild or guild.voice_client:
+            return None
+
+        channel: discord.abc.GuildChannel | None = guild.get_channel(snapshot["channel_id"])
+        home: discord.abc.GuildChannel | None = guild.get_channel(snapshot["home_id"])
+
+        if not isinstance(channel, discord.VoiceChannel | discord.StageChannel):
+            return None
+
+        if not isinstance(home, discord.TextChannel | discord.VoiceChannel):
+            return None
+
+        # Don't rejoin an empty channel just to be disconnected for inactivity...
+        if not any(not m.bot for m in channel.members):
+            return None
+
+        dj: discord.Member | None = guild.get_member(snapshot["dj_id"] or 0)
+        player: core.Player = core.Player(nodes=self._placement(), home=home, dj=dj)
+        vc: core.Player = await channel.connect(cls=player)  # type: ignore
+
+        vc.index_listeners()
+        await vc.restore(snapshot)
+
+        self._snapshot_keys[guild_id] = None
+        logger.info("Restored player in %s with %s queued tracks.", guild, len(vc.queue))
+
+        return vc
+
+    async def _restore_players(self) -> None:
+        await self.bot.wait_until_ready()
+
+        for guild_id, snapshot in await self.bot.database.fetch_player_snapshots():
+            # Loaded in cog_load, and only woken on demand...
+            if snapshot.get("hibernating"):
+                continue
+
+            # Seeded so snapshots which can't be restored are cleaned up by the next snapshot...
+            self._snapshot_keys.setdefault(guild_id, None)
+
+            try:
+                await self._restore_player(guild_id, snapshot)
+            except Exception as e:
+                logger.warning("Unable to restore player in %s: %s", guild_id, e)
+
+    async def hibernate(self, player: core.Player) -> None:
+        """Release everything held by a player, keeping only a snapshot to wake it from later."""
+        assert player.guild is not None
+        guild_id: int = player.guild.id
+
+        snapshot: PlayerSnapshot = player.snapshot()
+        snapshot["hibernating"] = True
+
+        # Marked before the first await, so the snapshot loop doesn't overwrite or delete the hibernating row...
+        self._hibernating[guild_id] = snapshot
+        self._snapshot_keys.pop(guild_id, None)
+
+        await self.bot.database.save_player_snapshot(guild_id, snapshot=snapshot)
+        await player.disconnect()
 
-        node: wavelink.Node = wavelink.Node(uri=uri, password=password)
-        await wavelink.Pool.connect(nodes=[node], cache_capacity=200, client=self.bot)
+        msg: str = f"Hibernating to save resources. Join {player.channel.mention} or use `/resume` to carry on."
+        await player.home.send(msg, delete_after=60, silent=True)
+
+        logger.info("Hibernated player in %s with %s queued tracks.", player.guild, len(snapshot["queue"]))
+
+    async def wake(self, guild_id: int) -> core.Player | None:
+        snapshot: PlayerSnapshot | None = self._hibernating.pop(guild_id, None)
+        if not snapshot:
+            return None
+
+        snapshot["hibernating"] = False
+
+        try:
+            vc: core.Player | None = await self._restore_player(guild_id, snapshot)
+        except Exception as e:
+            logger.warning("Unable to wake player in %s: %s", guild_id, e)
+            vc = None
+
+        if not vc:
+            self._hibernating[guild_id] = snapshot
+
+        return vc
+
+    @tasks.loop(minutes=1)
+    async def hibernate_idle(self) -> None:
+        now: float = time.monotonic()
+
+        for vc in self.bot.voice_clients:
+            if not isinstance(vc, core.Player) or not vc.connected:
+                continue
+
+            if not vc.current or (not vc.paused and vc.listeners):
+                vc.idle_since = None
+                continue
+
+            if vc.idle_since is None:
+                vc.idle_since = now
+            elif now - vc.idle_since >= HIBERNATE_AFTER:
+                try:
+                    await self.hibernate(vc)
+                except Exception as e:
+                    logger.warning("Unable to hibernate player in %s: %s", vc.guild, e)
+
+    def _placement(self) -> list[wavelink.Node] | None:
+        node: wavelink.Node | None = self.balancer.best()
+        return [node] if node else None
+
+    @tasks.loop(seconds=30)
+    async def balance_nodes(self) -> None:
+        for node in list(wavelink.Pool.nodes.values()):
+            if not node.players or not self.balancer.degraded(node):
+                continue
+
+            self.balancer.drain(node)
+
+            # Picked again for every player, so the moved load is spread by each node's growing player count...
+            for player in list(node.players.values()):
+                target: wavelink.Node | None = self.balancer.best(exclude=[node])
+                if not target:
+                    logger.warning("%r is degraded but there is no healthy node to move its players to.", node)
+                    break
+
+                try:
+                    await cast(core.Player, player).switch_to_node(target)
+                except Exception as e:
+                    logger.warning("Unable to move player %s off %r: %s", player.guild, node, e)
+
+    @commands.Cog.listener()
+    async def on_wavelink_node_stats(self, node: wavelink.Node, payload: wavelink.StatsEventPayload) -> None:
+        self.balancer.update(node, payload)
+
+    @commands.Cog.listener()
+    async def on_wavelink_node_closed(self, node: wavelink.Node, disconnected: list[wavelink.Player]) -> None:
+        self.balancer.discard(node)
+
+        # The node gave up reconnecting and its players were disconnected, rebuild them from their snapshots...
+        guilds: set[int] = {player.guild.id for player in disconnected if player.guild}
+        if not guilds:
+            return
+
+        for guild_id, snapshot in await self.bot.database.fetch_player_snapshots():
+            if guild_id not in guilds:
+                continue
+
+            try:
+                await self._restore_player(guild_id, snapshot)
+            except Exception as e:
+                logger.warning("Unable to restore player in %s after %r closed: %s", guild_id, node, e)
+
+    @commands.Cog.listener()
+    async def on_wavelink_node_ready(self, payload: wavelink.NodeReadyEventPayload) -> None:
+        if not self._restored:
+            self._restored = True
+
+            await self._restore_players()
+            self.snapshot_players.start()
+            self.hibernate_idle.start()
+            return
+
+        if payload.resumed:
+            return
+
+        # The node lost its session, E.g. it was restarted. Replay every player it was serving...
+        for player in payload.node.players.values():
+            try:
+                await cast(core.Player, player).replay()
+            except Exception as e:
+                logger.warning("Unable to replay player in %s after node reconnect: %s", player.guild, e)
 
     @commands.Cog.listener()
     async def on_wavelink_track_start(self, payload: wavelink.TrackStartEventPayload) -> None:
@@ -46,8 +305,55 @@ class Music(commands.Cog):
 
         await vc.send_view(track=track)
 
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message) -> None:
+        if not message.guild:
+            return
+
+        vc: core.Player | None = cast(core.Player | None, message.guild.voice_client)
+        if not vc or not vc.message or message.channel.id != vc.home.id or message.id == vc.message.id:
+            return
+
+        vc.messages_since.add(message.id)
+
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent) -> None:
+        if not payload.guild_id:
+            return
+
+        guild: discord.Guild | None = self.bot.get_guild(payload.guild_id)
+        vc: core.Player | None = cast(core.Player | None, guild and guild.voice_client)
+
+        if not vc:
+            return
+
+        if vc.message and vc.message.id == payload.message_id:
+            vc.message = None
+
+        vc.messages_since.discard(payload.message_id)
+
+    @commands.Cog.listener()
+    async def on_raw_bulk_message_delete(self, payload: discord.RawBulkMessageDeleteEvent) -> None:
+        if not payload.guild_id:
+            return
+
+        guild: discord.Guild | None = self.bot.get_guild(payload.guild_id)
+        vc: core.Player | None = cast(core.Player | None, guild and guild.voice_client)
+
+        if not vc:
+            return
+
+        if vc.message and vc.message.id in payload.message_ids:
+            vc.message = None
+
+        vc.messages_since.difference_update(payload.message_ids)
+
     @commands.Cog.listener()
     async def on_wavelink_inactive_player(self, player: core.Player) -> None:
+        if player.current or player.queue:
+            await self.hibernate(player)
+            return
+
         await player.disconnect()
         await player.home.send("Disconnecting due to inactivity. Bye!", delete_after=20)
 
@@ -61,35 +367,41 @@ class Music(commands.Cog):
         guild: discord.Guild = member.guild
         vc: core.Player | None = cast(core.Player | None, guild.voice_client)
 
+        if before.channel == after.channel:
+            return
+
         if not vc:
+            hibernating: PlayerSnapshot | None = self._hibernating.get(guild.id)
+
+            if hibernating and after.channel and after.channel.id == hibernating["channel_id"] and not member.bot:
+                await self.wake(guild.id)
             return
 
         if member == guild.me:
+            if after.channel:
+                vc.index_listeners(after.channel)
             return
 
-        channel: discord.VoiceChannel | None = vc.channel  # type: ignore
-        if not channel:
+        channel: discord.abc.Connectable | None = vc.channel
+        if not channel or member.bot or channel not in (before.channel, after.channel):
             return
 
-        members: list[discord.Member] = [m for m in channel.members if not m.bot]
-        try:
-            new: discord.Member = members[0]
-        except IndexError:
-            new = guild.me
+        if before.channel == channel:
+            vc.listeners.pop(member.id, None)
 
-        if before.channel == channel and after.channel != channel:
             if member != vc.dj:
                 return
 
-            vc.dj = new
+            new: int | None = next(iter(vc.listeners), None)
+            vc.dj = guild.get_member(new) if new else guild.me
             vc.next_payload = None
-            return
 
-        elif after.channel == channel and before.channel != channel:
+        else:
+            vc.listeners[member.id] = None
+
             if vc.dj == guild.me:
-                vc.dj = new
+                vc.dj = member
                 vc.next_payload = None
-                return
 
     async def connect(self, ctx: commands.Context[core.Bot]) -> core.Player:
         assert isinstance(ctx.author, discord.Member)
@@ -97,9 +409,14 @@ class Music(commands.Cog):
         if not ctx.author.voice or not ctx.author.voice.channel:
             raise ValueError("Please join a voice channel first!")
 
-        player: core.Player = core.Player(home=ctx.channel, dj=ctx.author)
+        # Starting over in another channel replaces whatever was hibernating in this guild...
+        if ctx.guild and self._hibernating.pop(ctx.guild.id, None):
+            await self.bot.database.delete_player_snapshot(ctx.guild.id)
+
+        player: core.Player = core.Player(nodes=self._placement(), home=ctx.channel, dj=ctx.author)
         vc: core.Player = await ctx.author.voice.channel.connect(cls=player)  # type: ignore
 
+        vc.index_listeners()
         vc.autoplay = wavelink.AutoPlayMode.enabled
         await vc.set_volume(50)
 
@@ -107,23 +424,45 @@ class Music(commands.Cog):
 
     @commands.hybrid_command()
     @commands.guild_only()
-    async def play(self, ctx: commands.Context[core.Bot], *, song: str) -> None:
+    async def play(
+        self,
+        ctx: commands.Context[core.Bot],
+        file: discord.Attachment | None = None,
+        *,
+        song: str | None = None,
+    ) -> None:
         """Request a song to play via search, YouTube/Music, Spotify, SoundCloud or Twitch.
 
+        Multiple songs can be requested at once, one per line, or with a text file of one song per line.
+
         Parameters
         ----------
+        file: discord.Attachment
+            A text file with one search or URL per line.
         song: str
             A search or URL from YouTube, Spotify, SoundCloud or Twitch.
         """
         assert isinstance(ctx.author, discord.Member)
         await ctx.defer()
 
+        # The attachment has to be read first, Discord removes a message's files when it is deleted...
         try:
-            await ctx.message.delete()
-        except discord.HTTPException:
-            pass
+            queries: list[str] = await self._collect_queries(song, file)
+        except ValueError as e:
+            await ctx.send(str(e), delete_after=20)
+            return
+        finally:
+            try:
+                await ctx.message.delete()
+            except discord.HTTPException:
+                pass
 
-        if not ctx.voice_client:
+        assert ctx.guild
+        woken: core.Player | None = None if ctx.voice_client else await self.wake(ctx.guild.id)
+
+        if woken:
+            vc: core.Player = woken
+        elif not ctx.voice_client:
             try:
                 vc: core.Player = await self.connect(ctx)
             except Exception as e:
@@ -140,36 +479,144 @@ class Music(commands.Cog):
             await ctx.send(f"You must request songs in {vc.home.mention}!", delete_after=20)
             return
 
+        if len(queries) > 1:
+            msg: str | None = await self._enqueue_bulk(vc, queries, requester=ctx.author)
+
+            if not msg:
+                await ctx.send("Could not find any songs for those requests.", delete_after=20)
+                return
+        else:
+            msg = await self._enqueue_single(ctx, vc, queries[0])
+
+            if not msg:
+                return
+
+        if not vc.playing:
+            await vc.play(vc.queue.get(), populate=True)
+        elif woken and vc.paused:
+            await vc.pause(False)
+        else:
+            await vc.send_view()
+
+        await ctx.send(f"{ctx.author.mention} {msg}", delete_after=30, silent=True)
+
+    async def _collect_queries(self, song: str | None, file: discord.Attachment | None) -> list[str]:
+        lines: list[str] = song.splitlines() if song else []
+
+        if file:
+            if file.size > MAX_BULK_FILE_SIZE:
+                raise ValueError(f"That file is too large, it can be at most `{MAX_BULK_FILE_SIZE // 1024}KB`.")
+
+            if file.content_type and not file.content_type.startswith("text/"):
+                raise ValueError("Please attach a text file with one song per line.")
+
+            lines.extend((await file.read()).decode("utf-8", errors="replace").splitlines())
+
+        queries: list[str] = [line.strip() for line in lines if line.strip()]
+        if not queries:
+            raise ValueError("Please provide a song to play!")
+
+        if len(queries) > MAX_BULK_QUERIES:
+            raise ValueError(f"You can request at most `{MAX_BULK_QUERIES}` songs at once.")
+
+        return queries
+
+    async def _enqueue_bulk(self, vc: core.Player, queries: list[str], *, requester: discord.Member) -> str | None:
+        semaphore: asyncio.Semaphore = asyncio.Semaphore(BULK_CONCURRENCY)
+
+        async def resolve(query: str) -> core.SearchResult | None:
+            async with semaphore:
+                try:
+                    return await self.search_cache.search(query)
+                except wavelink.LavalinkLoadException as e:
+                    logger.debug("Bulk request %r failed: %s", query, e)
+                    return None
+
+        # gather keeps the results in input order, however quickly each search finishes...
+        results: list[core.SearchResult | None] = await asyncio.gather(*(resolve(query) for query in queries))
+
+        entries: list[core.QueueEntry] = []
+        failed: list[str] = []
+
+        for query, search in zip(queries, results, strict=True):
+            if not search:
+                failed.append(query)
+                continue
+
+            if search.is_playlist:
+                entries.extend(search.entries(requester_id=requester.id))
+            else:
+                entries.append(core.QueueEntry(search.encoded[0], requester_id=requester.id))
+
+        if not entries:
+            return None
+
+        # Only the tracks which end up near the front of the queue are decoded...
+        vc.queue.load(entries)
+
+        msg: str = f"Added `{len(entries)}` songs from `{len(queries) - len(failed)}` requests to the queue."
+        if failed:
+            shown: str = ", ".join(f"`{discord.utils.escape_markdown(q[:50])}`" for q in failed[:5])
+            msg += f"\nCould not find `{len(failed)}` requests: {shown}{'...' if len(failed) > 5 else ''}"
+
+        return msg
+
+    async def _enqueue_single(self, ctx: commands.Context[core.Bot], vc: core.Player, song: str) -> str | None:
         try:
-            search: wavelink.Search = await wavelink.Playable.search(song)
+            search: core.SearchResult = await self.search_cache.search(song)
         except wavelink.LavalinkLoadException as e:
             await ctx.send(f"There was an error requesting this song: `{e}`. Please try again!")
-            return
+            return None
 
         if not search:
             await ctx.send(f"Could not find any songs with the query: `{song}`")
-            return
-
-        extras: wavelink.ExtrasNamespace = wavelink.ExtrasNamespace({"requester_id": ctx.author.id})
+            return None
 
-        if isinstance(search, wavelink.Playlist):
-            search.extras = extras
-
-            msg = f"Added the playlist: [{search.name}](<{search.url}>) with `{len(search.tracks)}` to the queue."
-            await vc.queue.put_wait(search)
+        if search.is_playlist:
+            msg: str = f"Added the playlist: [{search.name}](<{search.url}>) with `{len(search)}` to the queue."
+            vc.queue.load(search.entries(requester_id=ctx.author.id))
         else:
-            track: wavelink.Playable = search[0]
-            track.extras = extras
+            track: wavelink.Playable = core.QueueEntry(search.encoded[0], requester_id=ctx.author.id).materialize()
 
             msg = f"Added the song: [{track.title}](<{track.uri}>) to the queue."
             vc.queue.put(track)
 
-        if not vc.playing:
-            await vc.play(vc.queue.get(), populate=True)
-        else:
-            await vc.send_view()
+        return msg
 
-        await ctx.send(f"{ctx.author.mention} {msg}", delete_after=30, silent=True)
+    @commands.hybrid_command()
+    @commands.guild_only()
+    async def resume(self, ctx: commands.Context[core.Bot]) -> None:
+        """Wake up a hibernating player, or unpause the current one."""
+        assert ctx.guild and isinstance(ctx.author, discord.Member)
+        await ctx.defer(ephemeral=True)
+
+        vc: core.Player | None = cast(core.Player | None, ctx.voice_client)
+        hibernating: PlayerSnapshot | None = self._hibernating.get(ctx.guild.id)
+
+        if not vc and hibernating:
+            if not ctx.author.voice or not ctx.author.voice.channel:
+                await ctx.send("Please join a voice channel first!", ephemeral=True)
+                return
+
+            if ctx.author.voice.channel.id != hibernating["channel_id"]:
+                await ctx.send(f"Join <#{hibernating['channel_id']}> to resume the player.", ephemeral=True)
+                return
+
+            vc = await self.wake(ctx.guild.id)
+
+        if not vc:
+            await ctx.send("There is nothing to resume!", ephemeral=True)
+            return
+
+        if not vc.can_command(ctx.author):
+            await ctx.send("You can't control the player right now.", ephemeral=True)
+            return
+
+        if vc.paused:
+            await vc.pause(False)
+            vc.next_payload = None
+
+        await ctx.send("Resumed the player.", ephemeral=True)
 
     @commands.hybrid_command()
     @commands.guild_only()
@@ -184,22 +631,23 @@ class Music(commands.Cog):
             await ctx.send("I am not currently playing anything!", ephemeral=True)
             return
 
-        upcoming: list[wavelink.Playable] = vc.queue[:10] + vc.auto_queue[:10]
-        upcoming = upcoming[:10]
-
-        if not upcoming:
+        if not vc.queue and not vc.auto_queue:
             await ctx.send("No upcoming songs yet!", ephemeral=True)
             return
 
-        msg: str = ""
-        for index, track in enumerate(upcoming, 1):
-            if track.recommended:
-                msg += f"{index}. [{track}](<{track.uri}>) - `AutoPlay via {track.source}`\n"
-            else:
-                requester: discord.Member | None = ctx.guild.get_member(track.extras.get("requester_id", 0))
-                msg += f"{index}. [{track}](<{track.uri}>) - {requester.mention if requester else 'Unknown'}\n"
+        view: core.QueuePages = core.QueuePages(vc)
+        await ctx.send(embed=view.build_embed(), view=view, ephemeral=True, silent=True)
+
+    @commands.command(name="searchcache")
+    @commands.is_owner()
+    async def searchcache(self, ctx: commands.Context[core.Bot]) -> None:
+        """Show the search cache usage."""
+        stats: SearchCacheStats = self.search_cache.stats()
+        lookups: int = stats["hits"] + stats["misses"] + stats["coalesced"]
+        ratio: float = (stats["hits"] + stats["coalesced"]) / lookups if lookups else 0.0
 
-        await ctx.send(msg, ephemeral=True, silent=True)
+        rows: list[str] = [f"{key:<10} {value}" for key, value in stats.items()]
+        await ctx.send(f"Hit ratio: `{ratio:.1%}`\n```\n" + "\n".join(rows) + "\n```")
 
 
 async def setup(bot: core.Bot) -> None:
@@ -14,28 +14,38 @@ limitations under the License.
 """
 
 import asyncio
-import datetime
+import functools
+import hashlib
 import logging
-import re
+import time
+import urllib.parse
 from typing import TYPE_CHECKING
 
+import aiohttp
 import discord
-import requests
+from discord import app_commands
 from discord.ext import commands, tasks
 
 import core
-from types_.portals import SERVER_T
+from types_.portals import DIMENSION_T, SERVER_T, PortalPayload, Units
 
 
 if TYPE_CHECKING:
-    from types_.portals import PortalPayload, UnitMapping, Units
+    import sqlite3
+
+    from types_.portals import ScheduleDecision, UnitMapping
 
 
 logger: logging.Logger = logging.getLogger(__name__)
 
 
 URL: str = "https://www.vulbis.com/portal.php"
-PORTAL_RE: re.Pattern[str] = re.compile(r"\[(?P<pos>.*)\](.*?)(?P<updated>[0-9]{1,4})\s(?P<unit>h|m|s|d{1})?")
+# The original, single auto-updated board and the servers it showed. Adopted into the board registry once...
+LEGACY_BOARD_ID: int = 1250936053603242167
+LEGACY_BOARD_SERVERS: tuple[SERVER_T, ...] = ("Tal Kasha", "Draconiros", "Hell Mina")
+LEGACY_BOARD_MIGRATION: str = "legacy_portal_board"
+CHUNK_SIZE: int = 1024
+UNIT_SECONDS: dict[str, int] = {"days": 86400, "hours": 3600, "minutes": 60, "seconds": 1}
 
 
 class Portals(commands.Cog):
@@ -43,8 +53,30 @@ class Portals(commands.Cog):
         self.bot: core.Bot = bot
 
         self._last_payload: dict[SERVER_T, dict[str, PortalPayload]] = {name: {} for name in core.SERVERS}
+        self._fingerprints: dict[tuple[SERVER_T, str], bytes] = {}
+        self._changed: set[SERVER_T] = set()
+        self._messages: dict[tuple[int, SERVER_T], int] = {}
+        self._boards: dict[SERVER_T, dict[int, int]] = {}
+        self._rendered: dict[tuple[int, SERVER_T], int] = {}
+
+        self._moved: dict[SERVER_T, set[str]] = {}
+        self._subscriptions: dict[tuple[SERVER_T, str], dict[int, bool]] = {}
+
+        self._versions: dict[SERVER_T, int] = dict.fromkeys(core.SERVERS, 0)
+        self.epoch: int = int(time.time())
+        self._embeds: dict[SERVER_T, tuple[int, discord.Embed]] = {}
+
+        self._scheduler: core.ScrapeScheduler = core.ScrapeScheduler(
+            core.SERVERS,
+            budget=core.CONFIG["SCRAPER"].get("budget", 6 * len(core.SERVERS)),
+        )
+
+        self._concurrency: int = max(1, core.CONFIG["SCRAPER"].get("concurrency", 4))
+        self._queue: asyncio.Queue[tuple[SERVER_T, str, asyncio.Future[None]]] = asyncio.Queue()
+        self._workers: list[asyncio.Task[None]] = []
 
-        self._server_iter: core.ServerIter = core.ServerIter()
+        self._cookies: dict[SERVER_T, dict[str, str]] = {}
+        self._headers: dict[SERVER_T, dict[str, str]] = {}
         self._portals: list[str] = ["Xélorium", "Ecaflipus", "Enutrosor", "Srambad"]
 
         self.unit_mapping: UnitMapping = {"d": "days", "h": "hours", "m": "minutes", "s": "seconds"}
@@ -62,14 +94,18 @@ class Portals(commands.Cog):
             "Enurado": "<:Enutrosor:1259811658302488678>",
         }
 
-    @property
-    def cookies(self) -> dict[str, str]:
-        return {
-            "XÃ©loriumServer": "Tal%20Kasha",
-            "SrambadServer": "Tal%20Kasha",
-            "EnutrosorServer": "Tal%20Kasha",
-            "EcaflipusServer": "Tal%20Kasha",
-            "SERVER_CHOICE": "Tal%20Kasha",
+    def cookies(self, server: SERVER_T) -> dict[str, str]:
+        if server in self._cookies:
+            return self._cookies[server]
+
+        quoted: str = urllib.parse.quote(server)
+        cookies: dict[str, str] = {
+            # Header values are sent as UTF-8, so this is the same bytes requests sent for "XÃ©loriumServer"...
+            "XéloriumServer": quoted,
+            "SrambadServer": quoted,
+            "EnutrosorServer": quoted,
+            "EcaflipusServer": quoted,
+            "SERVER_CHOICE": quoted,
             "PERCENT_CHOICE": "0",
             "BUY_QTY": "1",
             "SELL_QTY": "1",
@@ -78,15 +114,23 @@ class Portals(commands.Cog):
             "cf_clearance": core.CONFIG["SCRAPER"]["cf_clearance"],
         }
 
-    @property
-    def headers(self) -> dict[str, str]:
-        return {
+        cookies.update(core.CONFIG["SCRAPER"].get("cookies", {}).get(server, {}))
+        self._cookies[server] = cookies
+
+        return cookies
+
+    def headers(self, server: SERVER_T) -> dict[str, str]:
+        if server in self._headers:
+            return self._headers[server]
+
+        quoted: str = urllib.parse.quote(server)
+        headers: dict[str, str] = {
             "accept": "*/*",
             "accept-language": "en-AU,en-US;q=0.9,en;q=0.8",
             "content-type": "application/x-www-form-urlencoded; charset=UTF-8",
             "origin": "https://www.vulbis.com",
             "priority": "u=1, i",
-            "referer": "https://www.vulbis.com/?server=Tal%20Kasha&gids=&percent=0&craftableonly=false&select-type=-1&sellchoice=false&buyqty=1&sellqty=1&percentsell=0",
+            "referer": f"https://www.vulbis.com/?server={quoted}&gids=&percent=0&craftableonly=false&select-type=-1&sellchoice=false&buyqty=1&sellqty=1&percentsell=0",
             "sec-ch-ua": '"Google Chrome";v="125", "Chromium";v="125", "Not.A/Brand";v="24"',
             "sec-ch-ua-arch": '"x86"',
             "sec-ch-ua-bitness": '"64"',
@@ -101,74 +145,284 @@ class Portals(commands.Cog):
             "sec-fetch-site": "same-origin",
             "user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/125.0.0.0 Safari/537.36",
             "x-requested-with": "XMLHttpRequest",
+            # Built by hand, aiohttp loads request cookies through http.cookies which rejects non-ASCII names...
+            "cookie": "; ".join(f"{name}={value}" for name, value in self.cookies(server).items()),
         }
 
+        self._headers[server] = headers
+        return headers
+
     async def cog_load(self) -> None:
+        self._workers = [asyncio.create_task(self._scrape_worker()) for _ in range(self._concurrency)]
+        await self._load_portals()
+
+        rows: list[sqlite3.Row] = await self.bot.database.fetch_portal_messages()
+        self._messages = {(row["channel_id"], row["server"]): row["message_id"] for row in rows}
+
+        rows = await self.bot.database.fetch_portal_boards()
+        for row in rows:
+            self._boards.setdefault(row["server"], {})[row["channel_id"]] = row["guild_id"]
+
+        rows = await self.bot.database.fetch_portal_subscriptions()
+        for row in rows:
+            self._subscriptions.setdefault((row["server"], row["portal"]), {})[row["target_id"]] = bool(
+                row["is_channel"]
+            )
+
         self.dip_updater.start()
 
-    def _parse_data(self, server: SERVER_T, *, portal: str, data: str) -> None:
-        match: re.Match[str] | None = PORTAL_RE.search("".join(data.splitlines()))
-        if not match:
-            return
+    async def cog_unload(self) -> None:
+        self.dip_updater.cancel()
+
+        for worker in self._workers:
+            worker.cancel()
+
+    async def _load_portals(self) -> None:
+        rows: list[sqlite3.Row] = await self.bot.database.fetch_latest_portals()
+
+        for row in rows:
+            server: SERVER_T = row["server"]
+            if server not in self._last_payload:
+                continue
+
+            pos: list[int] = [int(p) for p in row["pos"].split(",") if p]
+            payload: PortalPayload = self._build_payload(
+                pos=pos,
+                updated=row["updated"],
+                unit=row["unit"],
+                observed=row["observed"],
+            )
+            self._set_payload(server, portal=row["portal"], payload=payload)
+
+        logger.info("Loaded %s stored portal observations.", len(rows))
+
+    def _parse_data(self, server: SERVER_T, *, portal: str, parser: core.PortalParser) -> PortalPayload | None:
+        if parser.pos is None or parser.updated is None:
+            return None
+
+        pos: list[int] = parser.pos
+        updated: int = parser.updated
+        unit: Units = self.unit_mapping.get(parser.unit or "", "unknown")
 
-        pos: list[int] = [int(p) for p in match.group("pos").split(",")]
-        updated: int = int(match.group("updated"))
-        unit: Units = self.unit_mapping.get(match.group("unit"), "unknown")
+        previous: PortalPayload | None = self._last_payload[server].get(portal)
+        payload: PortalPayload = self._build_payload(pos=pos, updated=updated, unit=unit, observed=time.time())
 
-        self._last_payload[server][portal] = {"pos": pos, "updated": updated, "unit": unit}
+        if previous and self._same_report(previous, payload):
+            return None
 
-    def _convert_time(self, *, unit: str, updated: int) -> str:
-        if unit == "unknown":
+        self._set_payload(server, portal=portal, payload=payload)
+
+        # Only a portal moving counts towards the scrape schedule, a fresh report of the same position doesn't...
+        if not previous or previous.get("pos") != pos:
+            self._changed.add(server)
+
+        if previous and previous.get("pos") != pos:
+            self._moved.setdefault(server, set()).add(portal)
+
+        return payload
+
+    def _same_report(self, previous: PortalPayload, current: PortalPayload) -> bool:
+        if previous.get("pos") != current.get("pos"):
+            return False
+
+        before: int | None = previous.get("timestamp")
+        after: int | None = current.get("timestamp")
+
+        if before is None or after is None:
+            return (previous.get("updated"), previous.get("unit")) == (current.get("updated"), current.get("unit"))
+
+        before_unit: int = UNIT_SECONDS.get(previous.get("unit", ""), 1)
+        after_unit: int = UNIT_SECONDS.get(current.get("unit", ""), 1)
+
+        # A more precise age for the same position is always worth keeping, E.g. "20 h" after "1 d"...
+        if after_unit < before_unit:
+            return False
+
+        # The age is truncated to its unit, so each report places the event somewhere in [timestamp - unit, timestamp]...
+        return before - before_unit <= after and after - after_unit <= before
+
+    def _build_payload(self, *, pos: list[int], updated: int, unit: Units, observed: float) -> PortalPayload:
+        payload: PortalPayload = {"pos": pos, "updated": updated, "unit": unit}
+
+        # Resolve the relative update age into an absolute timestamp once, at the time it was observed...
+        if unit in UNIT_SECONDS:
+            payload["timestamp"] = int(observed - updated * UNIT_SECONDS[unit])
+
+        return payload
+
+    def _set_payload(self, server: SERVER_T, *, portal: str, payload: PortalPayload) -> None:
+        self._last_payload[server][portal] = payload
+        self._versions[server] += 1
+
+    def portal_snapshot(self, server: SERVER_T) -> tuple[int, dict[str, PortalPayload]] | None:
+        if server not in self._last_payload:
+            return None
+
+        return self._versions[server], self._last_payload[server]
+
+    def _convert_time(self, timestamp: int | None) -> str:
+        if timestamp is None:
             return "Unknown"
 
-        seconds: float = (
-            updated * 86400
-            if unit == "days"
-            else updated * 3600
-            if unit == "hours"
-            else updated * 60
-            if unit == "minutes"
-            else updated
-        )
-        delta: datetime.datetime = datetime.datetime.now() - datetime.timedelta(seconds=seconds)
+        return f"<t:{timestamp}:R>"
 
-        return f"<t:{int(delta.timestamp())}:R>"
+    async def _fetch_portal(self, server: SERVER_T, *, portal: str) -> None:
+        data: bytes = urllib.parse.urlencode({"portal": portal, "server": server}).encode()
 
-    def _fetch_portals(self, server: SERVER_T) -> None:
-        for portal in self._portals:
-            data: bytes = f"portal={portal}&server={server}".encode()
+        headers: dict[str, str] = self.headers(server)
 
-            resp = requests.post(URL, cookies=self.cookies, headers=self.headers, data=data)
-            if resp.status_code != 200:
-                logger.warning("Unable to fetch portal position for: %s | %s", portal, resp.status_code)
-                return
+        # The upstream does not support conditional requests on this endpoint, so fingerprint what we read instead...
+        hasher = hashlib.blake2b(digest_size=16)
 
-            html: str = resp.text
-            self._parse_data(server, portal=self._english_names.get(portal, portal), data=html)
+        try:
+            async with self.bot.session.post(URL, headers=headers, data=data) as resp:
+                if resp.status != 200:
+                    logger.warning("Unable to fetch portal position for: %s | %s", portal, resp.status)
+                    return
+
+                parser: core.PortalParser = core.PortalParser(resp.charset or "utf-8")
+
+                async for chunk in resp.content.iter_chunked(CHUNK_SIZE):
+                    hasher.update(chunk)
+
+                    if parser.feed(chunk):
+                        break
+                else:
+                    parser.close()
+
+                # Drain the rest without parsing it so the connection can be returned to the pool...
+                async for _ in resp.content.iter_any():
+                    pass
+        except aiohttp.ClientError as e:
+            logger.warning("Unable to fetch portal position for: %s | %s", portal, e)
+            return
+
+        digest: bytes = hasher.digest()
+        if self._fingerprints.get((server, portal)) == digest:
+            return
+
+        self._fingerprints[(server, portal)] = digest
+
+        name: str = self._english_names.get(portal, portal)
+        payload: PortalPayload | None = self._parse_data(server, portal=name, parser=parser)
+
+        if payload:
+            await self.bot.database.add_portal_observation(server, portal=name, payload=payload)
+
+    def _notify_subscribers(self) -> None:
+        moved: dict[SERVER_T, set[str]] = self._moved
+        self._moved = {}
+
+        # Batch every change a target is interested in into as few messages as possible...
+        batches: dict[int, tuple[bool, list[str]]] = {}
+
+        for server, portals in moved.items():
+            for portal in sorted(portals):
+                every: dict[int, bool] = self._subscriptions.get((server, ""), {})
+                targets: dict[int, bool] = every | self._subscriptions.get((server, portal), {})
+                if not targets:
+                    continue
+
+                pos: list[int] | None = self._last_payload[server][portal].get("pos")
+                line: str = f"{self.emojis[portal]} **{server}** - {portal} Dimension moved to `{pos}`"
+
+                for target, is_channel in targets.items():
+                    batches.setdefault(target, (is_channel, []))[1].append(line)
+
+        for target, (is_channel, lines) in batches.items():
+            for content in self._chunk_lines(lines):
+                job = functools.partial(self._send_notification, target, is_channel=is_channel, content=content)
+                self.bot.dispatcher.submit(target, job)
+
+    def _chunk_lines(self, lines: list[str], *, limit: int = 2000) -> list[str]:
+        chunks: list[str] = []
+        current: list[str] = []
+        size: int = 0
+
+        for line in lines:
+            if current and size + len(line) + 1 > limit:
+                chunks.append("\n".join(current))
+                current, size = [], 0
+
+            current.append(line)
+            size += len(line) + 1
+
+        if current:
+            chunks.append("\n".join(current))
+
+        return chunks
+
+    async def _send_notification(self, target_id: int, *, is_channel: bool, content: str) -> None:
+        destination: discord.abc.Messageable
+
+        try:
+            if is_channel:
+                destination = self.bot.get_partial_messageable(target_id)
+            else:
+                destination = self.bot.get_user(target_id) or await self.bot.fetch_user(target_id)
+
+            await destination.send(content)
+        except (discord.Forbidden, discord.NotFound):
+            logger.info("Removing portal subscriptions for unreachable target: %s", target_id)
+
+            for targets in self._subscriptions.values():
+                targets.pop(target_id, None)
+
+            await self.bot.database.remove_portal_subscriptions(target_id)
+
+    async def _scrape_worker(self) -> None:
+        while True:
+            server, portal, future = await self._queue.get()
+
+            try:
+                await self._fetch_portal(server, portal=portal)
+            except Exception as e:
+                logger.exception("Unhandled error while fetching portal %s for %s", portal, server, exc_info=e)
+            finally:
+                if not future.done():
+                    future.set_result(None)
+
+                self._queue.task_done()
+
+    async def _fetch_portals(self, servers: list[SERVER_T]) -> None:
+        # Every (server, portal) request is independent, so any free worker can take the next one...
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        futures: list[asyncio.Future[None]] = []
+
+        for server in servers:
+            for portal in self._portals:
+                future: asyncio.Future[None] = loop.create_future()
+                self._queue.put_nowait((server, portal, future))
+                futures.append(future)
+
+        await asyncio.gather(*futures)
 
     def generate_embed(self, server: SERVER_T) -> discord.Embed:
+        version: int = self._versions[server]
+
+        cached: tuple[int, discord.Embed] | None = self._embeds.get(server)
+        if cached and cached[0] == version:
+            return cached[1]
+
         embed: discord.Embed = discord.Embed(title=f"{server} - Portals", color=0xF7B5C2)
         embed.set_thumbnail(url=self.bot.user.avatar.url)  # type: ignore
 
-        if not self._last_payload:
-            embed.description = "No portal data available!"
-            return embed
-
         data: dict[str, PortalPayload] = self._last_payload[server]
+        if not data:
+            embed.description = "No portal data available!"
 
         for key, value in data.items():
             position: str = str(value.get("pos", "Unknown"))
-            unit: str = value.get("unit", "unknown")
-            updated: int = value.get("updated", 0)
             name: str = key
 
-            stamp: str = self._convert_time(unit=unit, updated=updated)
+            stamp: str = self._convert_time(value.get("timestamp"))
             embed.add_field(name=f"{name} Dimension", value=f"`{position}`\n{self.emojis[name]} {stamp}", inline=False)
 
+        self._embeds[server] = (version, embed)
         return embed
 
     @commands.hybrid_command()
-    async def portals(self, ctx: commands.Context[core.Bot], *, server: SERVER_T) -> None:
+    async def portals(self, ctx: commands.Context[core.Bot], *, server: str) -> None:
         """Fetch the last known positions of the dimension portals.
 
         Parameters
@@ -178,37 +432,318 @@ class Portals(commands.Cog):
         """
         await ctx.defer(ephemeral=True)
 
+        if server not in self._last_payload:
+            await ctx.send(f"`{server}` is not a tracked server.", ephemeral=True)
+            return
+        self._scheduler.record_request(server)
+
         embed: discord.Embed = self.generate_embed(server)
         await ctx.send(embed=embed, ephemeral=True)
 
-    async def _update_dip(self, server: SERVER_T) -> None:
-        embed: discord.Embed = self.generate_embed(server)
-        channel: discord.TextChannel | None = self.bot.get_channel(1250936053603242167)  # type: ignore
+    @commands.hybrid_command()
+    async def subscribe(
+        self,
+        ctx: commands.Context[core.Bot],
+        server: str,
+        dimension: DIMENSION_T | None = None,
+        channel: discord.TextChannel | None = None,
+    ) -> None:
+        """Get notified whenever a dimension portal moves.
+
+        Parameters
+        ----------
+        server: str
+            The server to follow Portal Positions for.
+        dimension: str
+            Only notify for this dimension. Defaults to every dimension.
+        channel: discord.TextChannel
+            Post notifications in this channel instead of your DMs. Requires Manage Channels.
+        """
+        await ctx.defer(ephemeral=True)
 
-        if not channel:
-            logger.warning("Unable to find the Discord International Pub channel for auto-updates.")
+        target: int | None = await self._subscription_target(ctx, server=server, channel=channel)
+        if target is None:
             return
 
-        history: list[discord.Message] = [m async for m in channel.history()]
+        portal: str = dimension or ""
+        self._subscriptions.setdefault((server, portal), {})[target] = channel is not None
+
+        await self.bot.database.add_portal_subscription(
+            target, is_channel=channel is not None, server=server, portal=portal
+        )
+        await ctx.send(f"Subscribed to {dimension or 'all'} portal changes on `{server}`.", ephemeral=True)
+
+    @commands.hybrid_command()
+    async def unsubscribe(
+        self,
+        ctx: commands.Context[core.Bot],
+        server: str,
+        dimension: DIMENSION_T | None = None,
+        channel: discord.TextChannel | None = None,
+    ) -> None:
+        """Stop being notified when a dimension portal moves.
+
+        Parameters
+        ----------
+        server: str
+            The server to stop following Portal Positions for.
+        dimension: str
+            The dimension to unsubscribe from. Defaults to the subscription for every dimension.
+        channel: discord.TextChannel
+            Remove the subscription from this channel instead of your DMs. Requires Manage Channels.
+        """
+        await ctx.defer(ephemeral=True)
+
+        target: int | None = await self._subscription_target(ctx, server=server, channel=channel)
+        if target is None:
+            return
+
+        portal: str = dimension or ""
+        self._subscriptions.get((server, portal), {}).pop(target, None)
+
+        await self.bot.database.remove_portal_subscription(target, server=server, portal=portal)
+        await ctx.send(f"Unsubscribed from {dimension or 'all'} portal changes on `{server}`.", ephemeral=True)
+
+    @commands.hybrid_group()
+    @commands.guild_only()
+    async def board(self, ctx: commands.Context[core.Bot]) -> None:
+        """Manage the auto-updating portal boards in this server."""
+        await ctx.send_help(ctx.command)
+
+    @board.command(name="add")
+    @commands.guild_only()
+    @commands.has_permissions(manage_guild=True)
+    async def board_add(
+        self,
+        ctx: commands.Context[core.Bot],
+        server: str,
+        channel: discord.TextChannel | None = None,
+    ) -> None:
+        """Post an auto-updating portal board for a server.
+
+        Parameters
+        ----------
+        server: str
+            The server to post Portal Positions for.
+        channel: discord.TextChannel
+            The channel to post the board in. Defaults to the current channel.
+        """
+        assert ctx.guild
+        await ctx.defer(ephemeral=True)
+
+        if server not in self._last_payload:
+            await ctx.send(f"`{server}` is not a tracked server.", ephemeral=True)
+            return
+
+        target: discord.abc.MessageableChannel = channel or ctx.channel
+        await self._add_board(target.id, server=server, guild_id=ctx.guild.id)
+
+        self._refresh_boards([server])
+        await ctx.send(f"Added a `{server}` portal board to <#{target.id}>.", ephemeral=True)
+
+    @board.command(name="remove")
+    @commands.guild_only()
+    @commands.has_permissions(manage_guild=True)
+    async def board_remove(
+        self,
+        ctx: commands.Context[core.Bot],
+        server: str,
+        channel: discord.TextChannel | None = None,
+    ) -> None:
+        """Remove an auto-updating portal board.
+
+        Parameters
+        ----------
+        server: str
+            The server of the board to remove.
+        channel: discord.TextChannel
+            The channel the board is in. Defaults to the current channel.
+        """
+        await ctx.defer(ephemeral=True)
+
+        target: discord.abc.MessageableChannel = channel or ctx.channel
+        if target.id not in self._boards.get(server, {}):
+            await ctx.send(f"There is no `{server}` portal board in <#{target.id}>.", ephemeral=True)
+            return
+
+        message_id: int | None = self._messages.get((target.id, server))
+        await self._remove_board(target.id, server=server)
+
+        if message_id:
+            try:
+                await target.get_partial_message(message_id).delete()  # type: ignore
+            except discord.HTTPException:
+                pass
+
+        await ctx.send(f"Removed the `{server}` portal board from <#{target.id}>.", ephemeral=True)
+
+    async def _subscription_target(
+        self,
+        ctx: commands.Context[core.Bot],
+        *,
+        server: str,
+        channel: discord.TextChannel | None,
+    ) -> int | None:
+        if server not in self._last_payload:
+            await ctx.send(f"`{server}` is not a tracked server.", ephemeral=True)
+            return None
+
+        if channel is None:
+            return ctx.author.id
+
+        if not isinstance(ctx.author, discord.Member) or not channel.permissions_for(ctx.author).manage_channels:
+            await ctx.send(f"You need Manage Channels in {channel.mention} to do that.", ephemeral=True)
+            return None
+
+        return channel.id
+
+    @board_remove.autocomplete("server")
+    @board_add.autocomplete("server")
+    @unsubscribe.autocomplete("server")
+    @subscribe.autocomplete("server")
+    @portals.autocomplete("server")
+    async def portals_autocomplete(
+        self, interaction: discord.Interaction[core.Bot], current: str
+    ) -> list[app_commands.Choice[str]]:
+        current = current.casefold()
+        choices: list[app_commands.Choice[str]] = [
+            app_commands.Choice(name=server, value=server) for server in core.SERVERS if current in server.casefold()
+        ]
+
+        return choices[:25]
+
+    def _refresh_boards(self, servers: list[SERVER_T]) -> None:
+        for server in servers:
+            version: int = self._versions[server]
+
+            for channel_id in self._boards.get(server, {}):
+                if self._rendered.get((channel_id, server)) == version:
+                    continue
+
+                job = functools.partial(self._update_board, channel_id, server=server)
+                self.bot.dispatcher.submit(channel_id, job)
+
+    async def _update_board(self, channel_id: int, *, server: SERVER_T) -> None:
+        version: int = self._versions[server]
+        if channel_id not in self._boards.get(server, {}) or self._rendered.get((channel_id, server)) == version:
+            return
+
+        embed: discord.Embed = self.generate_embed(server)
+        channel: discord.PartialMessageable = self.bot.get_partial_messageable(channel_id)
+
+        message_id: int | None = self._messages.get((channel_id, server))
+        if message_id:
+            try:
+                await channel.get_partial_message(message_id).edit(embed=embed)
+            except discord.NotFound:
+                logger.info("Portal message for %s in %s was removed, recreating it.", server, channel_id)
+            except discord.Forbidden:
+                logger.info("Removing portal board for %s in inaccessible channel: %s", server, channel_id)
+                await self._remove_board(channel_id, server=server)
+                return
+            else:
+                self._rendered[(channel_id, server)] = version
+                return
 
         try:
-            previous: discord.Message = history[self._server_iter.index]
-        except IndexError:
-            await channel.send(embed=embed)
-        else:
-            await previous.edit(embed=embed)
+            message: discord.Message = await channel.send(embed=embed)
+        except (discord.Forbidden, discord.NotFound):
+            logger.info("Removing portal board for %s in unreachable channel: %s", server, channel_id)
+            await self._remove_board(channel_id, server=server)
+            return
+
+        self._messages[(channel_id, server)] = message.id
+        self._rendered[(channel_id, server)] = version
+
+        await self.bot.database.set_portal_message(channel_id, server=server, message_id=message.id)
+
+    async def _add_board(self, channel_id: int, *, server: SERVER_T, guild_id: int) -> None:
+        self._boards.setdefault(server, {})[channel_id] = guild_id
+        await self.bot.database.add_portal_board(channel_id, server=server, guild_id=guild_id)
 
-    @tasks.loop(minutes=10)
+    async def _remove_board(self, channel_id: int, *, server: SERVER_T) -> None:
+        self._boards.get(server, {}).pop(channel_id, None)
+        self._messages.pop((channel_id, server), None)
+        self._rendered.pop((channel_id, server), None)
+
+        await self.bot.database.remove_portal_board(channel_id, server=server)
+
+    @tasks.loop(minutes=1)
     async def dip_updater(self) -> None:
-        server: SERVER_T = next(self._server_iter)
-        await asyncio.to_thread(self._fetch_portals, server)
+        servers: list[SERVER_T] = self._scheduler.next_batch()
+        if not servers:
+            return
+
+        await self._fetch_portals(servers)
+        self._notify_subscribers()
 
-        await self._update_dip(server)
+        for server in servers:
+            if server in self._changed:
+                self._changed.discard(server)
+                self._scheduler.record_change(server)
+
+        self._refresh_boards(servers)
+
+    @commands.command(name="schedule")
+    @commands.is_owner()
+    async def schedule(self, ctx: commands.Context[core.Bot]) -> None:
+        """Show the most recent portal scrape scheduling decision."""
+        if not self._scheduler.decisions:
+            await ctx.send("No scheduling decisions have been made yet.")
+            return
+
+        decisions: list[ScheduleDecision] = self._scheduler.decisions[-1]
+        rows: list[str] = [
+            f"{'*' if d['selected'] else ' '} {d['server']:<12} score={d['score']:>6.2f} "
+            f"interval={int(d['interval']):>5}s changes={d['changes']:.2f} requests={d['requests']:.2f}"
+            for d in decisions
+        ]
+
+        header: str = f"Tokens: {self._scheduler.tokens:.2f} | Last decision: <t:{int(decisions[0]['at'])}:R>"
+        await ctx.send(header + "\n```\n" + "\n".join(rows) + "\n```")
 
     @dip_updater.before_loop
     async def dip_updater_before(self) -> None:
         await self.bot.wait_until_ready()
 
+        if await self.bot.database.has_migration(LEGACY_BOARD_MIGRATION):
+            return
+
+        channel: discord.abc.GuildChannel | None = self.bot.get_channel(LEGACY_BOARD_ID)  # type: ignore
+        if not isinstance(channel, discord.TextChannel):
+            return
+
+        await self._seed_legacy_board(channel)
+        await self.bot.database.add_migration(LEGACY_BOARD_MIGRATION)
+
+    async def _seed_legacy_board(self, channel: discord.TextChannel) -> None:
+        servers: list[SERVER_T] = [s for s in core.SERVERS if s in LEGACY_BOARD_SERVERS]
+        titles: dict[str, SERVER_T] = {f"{server} - Portals": server for server in servers}
+
+        # Only the bot's own board embeds are adopted, anything else it sent there is left alone...
+        found: dict[SERVER_T, int] = {}
+
+        try:
+            async for message in channel.history(limit=50):
+                if message.author != self.bot.user or not message.embeds:
+                    continue
+
+                server: SERVER_T | None = titles.get(message.embeds[0].title or "")
+                if server and server not in found:
+                    found[server] = message.id
+        except discord.HTTPException as e:
+            logger.warning("Unable to read the legacy portal board history: %s", e)
+
+        for server in servers:
+            await self._add_board(channel.id, server=server, guild_id=channel.guild.id)
+
+            message_id: int | None = found.get(server) or self._messages.get((channel.id, server))
+            if message_id:
+                self._messages[(channel.id, server)] = message_id
+                await self.bot.database.set_portal_message(channel.id, server=server, message_id=message_id)
+
+        logger.info("Adopted the legacy portal board for %s server(s).", len(servers))
+
 
 async def setup(bot: core.Bot) -> None:
     await bot.add_cog(Portals(bot))
@@ -13,24 +13,46 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
-from typing import TypedDict
+from typing import NotRequired, TypedDict
 
 
 class Bot(TypedDict):
     token: str
     debug: bool
+    database: NotRequired[str]
 
 
 class Scraper(TypedDict):
     cf_clearance: str
+    concurrency: NotRequired[int]
+    budget: NotRequired[float]
+    servers: NotRequired[list[str]]
+    cookies: NotRequired[dict[str, dict[str, str]]]
 
 
-class Wavelink(TypedDict):
+class WavelinkNode(TypedDict):
     host: str
     password: str
+    identifier: NotRequired[str]
+
+
+class Wavelink(TypedDict):
+    host: NotRequired[str]
+    password: NotRequired[str]
+    nodes: NotRequired[list[WavelinkNode]]
+    search_cache_tracks: NotRequired[int]
+    search_cache_ttl: NotRequired[float]
+    history_size: NotRequired[int]
+
+
+class Api(TypedDict, total=False):
+    enabled: bool
+    host: str
+    port: int
 
 
 class Config(TypedDict):
     BOT: Bot
     SCRAPER: Scraper
     WAVELINK: Wavelink
+    API: NotRequired[Api]
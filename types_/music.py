@@ -0,0 +1,45 @@
+"""Copyright 2024 Mysty<evieepy@gmail.com>
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from typing import NotRequired, TypedDict
+
+
+# Encoded track, requester ID and whether it was recommended by AutoPlay...
+type SnapshotEntry = tuple[str, int, bool]
+
+
+class SearchCacheStats(TypedDict):
+    size: int
+    tracks: int
+    capacity: int
+    inflight: int
+    hits: int
+    misses: int
+    coalesced: int
+    expired: int
+
+
+class PlayerSnapshot(TypedDict):
+    channel_id: int
+    home_id: int
+    dj_id: int | None
+    volume: int
+    paused: bool
+    mode: int
+    autoplay: int
+    position: int
+    current: SnapshotEntry | None
+    queue: list[SnapshotEntry]
+    hibernating: NotRequired[bool]
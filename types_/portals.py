@@ -17,7 +17,8 @@ from typing import Literal, TypedDict
 
 
 type Units = Literal["days", "hours", "minutes", "seconds", "unknown"]
-type SERVER_T = Literal["Tal Kasha", "Draconiros", "Hell Mina"]
+type SERVER_T = str
+type DIMENSION_T = Literal["Xelorium", "Ecaflipus", "Enurado", "Srambad"]
 
 
 class UnitMapping(TypedDict):
@@ -31,3 +32,14 @@ class PortalPayload(TypedDict, total=False):
     pos: list[int]
     updated: int
     unit: Units
+    timestamp: int
+
+
+class ScheduleDecision(TypedDict):
+    server: SERVER_T
+    score: float
+    interval: float
+    changes: float
+    requests: float
+    selected: bool
+    at: float